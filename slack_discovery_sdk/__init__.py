@@ -3,10 +3,12 @@
 
 """The Slack Web API allows you to build applications that interact with Slack
 in more complex ways than the integrations we provide out of the box."""
+from .async_client import AsyncDiscoveryClient
 from .client import DiscoveryClient
 from .oauth import DiscoveryOAuthApp
 
 __all__ = [
+    "AsyncDiscoveryClient",
     "DiscoveryClient",
     "DiscoveryOAuthApp",
 ]
@@ -0,0 +1,485 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""A Python module for interacting with Slack's Discovery API in asyncio apps."""
+
+import asyncio
+import json
+import logging
+from base64 import b64encode
+from logging import Logger
+from ssl import SSLContext
+from typing import Dict, Optional, Union
+from urllib.parse import urlencode
+
+from .async_http_transport import (
+    AsyncHTTPTransport,
+    AsyncPooledHTTPTransport,
+)  # type:ignore
+from .async_rate_limit_support import AsyncRateLimiter  # type:ignore
+from .async_response import AsyncDiscoveryResponse  # type:ignore
+from .errors import DiscoveryRequestError, DiscoveryApiError  # type:ignore
+from .internal_utils import (
+    convert_bool_to_0_or_1,
+    get_user_agent,
+    _get_url,
+    _build_unexpected_body_error_message,
+    _validate_priority,
+)  # type:ignore
+from .rate_limit_support import RateLimiter  # type:ignore
+from .retry_support import (  # type:ignore
+    RateLimitErrorRetryHandler,
+    RetryEngine,
+    RetryRequest,
+)
+
+
+class AsyncBaseDiscoveryClient:
+    BASE_URL = "https://slack.com/api/"
+
+    token: Optional[str]
+    base_url: str
+    timeout: int
+    ssl: Optional[SSLContext]
+    headers: Dict[str, str]
+    default_params: Dict[str, str]
+    logger: Logger
+    rate_limit_error_prevention_enabled: bool
+    number_of_rate_limiter_enabled_nodes: int
+    rate_limiter: AsyncRateLimiter
+    transport: AsyncHTTPTransport
+    retry_engine: RetryEngine
+    # The default priority of the API calls (one of RateLimiter.PRIORITIES)
+    priority: str
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = BASE_URL,
+        timeout: int = 30,
+        ssl: Optional[SSLContext] = None,
+        headers: Optional[Dict[str, str]] = None,
+        user_agent_prefix: Optional[str] = None,
+        user_agent_suffix: Optional[str] = None,
+        # for Org-Wide App installation
+        team_id: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+        rate_limit_error_prevention_enabled: bool = True,
+        number_of_rate_limiter_enabled_nodes: int = 1,
+        rate_limiter: Optional[Union[AsyncRateLimiter, RateLimiter]] = None,
+        transport: Optional[AsyncHTTPTransport] = None,
+        retry_engine: Optional[RetryEngine] = None,
+        priority: str = RateLimiter.PRIORITY_DEFAULT,
+    ):
+        self.token = None if token is None else token.strip()
+        self.base_url = base_url
+        self.timeout = timeout
+        self.ssl = ssl
+        self.headers = headers or {}
+        self.headers["User-Agent"] = get_user_agent(
+            user_agent_prefix, user_agent_suffix
+        )
+        self.default_params = {}
+        if team_id is not None:
+            self.default_params["team_id"] = team_id
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+
+        _validate_priority(priority)
+        self.priority = priority
+        self.rate_limit_error_prevention_enabled = rate_limit_error_prevention_enabled
+        self.number_of_rate_limiter_enabled_nodes = number_of_rate_limiter_enabled_nodes
+        if isinstance(rate_limiter, AsyncRateLimiter):
+            self.rate_limiter = rate_limiter
+        else:
+            # A RateLimiter can be shared with DiscoveryClient instances
+            self.rate_limiter = AsyncRateLimiter(
+                rate_limiter=rate_limiter,
+                number_of_nodes=number_of_rate_limiter_enabled_nodes,
+            )
+        if retry_engine is not None:
+            self.retry_engine = retry_engine
+        else:
+            # By default, only rate limited errors are retried when the error prevention is enabled
+            self.retry_engine = RetryEngine(
+                handlers=[RateLimitErrorRetryHandler()]
+                if rate_limit_error_prevention_enabled
+                else []
+            )
+        self.transport = (
+            transport
+            if transport is not None
+            else AsyncPooledHTTPTransport(ssl=self.ssl, logger=self.logger)
+        )
+
+    async def api_call(  # skipcq: PYL-R1710
+        self,
+        api_method: str,
+        *,
+        http_method: str = "POST",
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        auth: Optional[dict] = None,
+    ) -> AsyncDiscoveryResponse:
+        """Create a request and execute the API call to Slack.
+        Args:
+            api_method (str): The target Slack API method.
+                e.g. 'discovery.enterprise.info'
+            http_method (str): The HTTP method
+                e.g. POST, GET
+            params (dict): The URL parameters to append to the URL.
+                e.g. {'key1': 'value1', 'key2': 'value2'}
+            headers (dict): Additional request headers
+            auth (dict): A dictionary that consists of client_id and client_secret
+        Returns:
+            (AsyncDiscoveryResponse)
+                The server's response to an HTTP request. Data
+                from the response can be accessed like a dict.
+                If the response included 'next_cursor' it can
+                be iterated on with `async for` to execute subsequent requests.
+        Raises:
+            DiscoveryApiError: The following Slack API call failed:
+                'discovery.enterprise.info'.
+        """
+
+        api_url = _get_url(self.base_url, api_method)
+        headers = headers or {}
+        headers.update(self.headers)
+
+        # Basic Auth for oauth.v2.access
+        if auth is not None:
+            if isinstance(auth, str):
+                headers["Authorization"] = auth
+            elif isinstance(auth, dict):
+                client_id, client_secret = auth["client_id"], auth["client_secret"]
+                value = b64encode(
+                    f"{client_id}:{client_secret}".encode("utf-8")
+                ).decode("ascii")
+                headers["Authorization"] = f"Basic {value}"
+            else:
+                self.logger.warning(
+                    f"As the auth: {auth}: {type(auth)} is unsupported, skipped"
+                )
+
+        token = self.token
+        params = params or {}
+        if "token" in params:
+            param_token = params.pop("token")
+            if param_token is not None:
+                token = param_token
+        # The priority of this call (e.g., realtime for DLP enforcement) in the rate limiter
+        priority = self.priority
+        if "priority" in params:
+            param_priority = params.pop("priority")
+            if param_priority is not None:
+                _validate_priority(param_priority)
+                priority = param_priority
+        # if param is None, do not include it in API call
+        cleansed_params = {k: v for k, v in params.items() if v is not None}
+        return await self._async_api_call(
+            token=token,
+            http_method=http_method,
+            url=api_url,
+            params=cleansed_params or {},
+            additional_headers=headers or {},
+            priority=priority,
+        )
+
+    async def fetch_next_page(
+        self,
+        http_method: str,
+        api_url: str,
+        headers: Dict[str, str],
+        params: Dict[str, str],
+        priority: Optional[str] = None,
+    ) -> Dict[str, any]:  # type:ignore
+        """This method is supposed to be used only for AsyncDiscoveryResponse pagination
+        You can paginate using Python's async for iterator as below:
+          async for response in await client.discovery_conversations_list(limit=100):
+              # do something with each response here
+        """
+        response = await self._perform_http_request(
+            http_method=http_method,
+            url=api_url,
+            headers=headers or {},
+            params=params or {},
+            priority=priority,
+        )
+        return {
+            "status_code": int(response["status"]),
+            "headers": dict(response["headers"]),
+            "body": json.loads(response["body"]),
+        }
+
+    async def close(self):
+        """Closes all the kept-alive connections."""
+        await self.transport.close()
+
+    async def _async_api_call(
+        self,
+        *,
+        token: Optional[str] = None,
+        http_method: str,
+        url: str,
+        params: Dict[str, str],
+        additional_headers: Dict[str, str],
+        priority: Optional[str] = None,
+    ) -> AsyncDiscoveryResponse:
+        """Performs a Slack API request and returns the result.
+        Args:
+            token: Slack API Token (either bot token or user token)
+            url: Complete URL (e.g., https://slack.com/api/discovery.enterprise.info)
+            params: Form body params
+            additional_headers: Request headers to append
+            priority: The priority in the rate limiter (default: the client's priority)
+        Returns:
+            API response
+        """
+
+        # True/False -> "1"/"0"
+        params = convert_bool_to_0_or_1(params)
+        request_headers = self._build_request_headers(
+            token=self.token if token is None else token,
+            additional_headers=additional_headers,
+        )
+        response = await self._perform_http_request(
+            http_method=http_method,
+            url=url,
+            headers=request_headers,
+            params=params,
+            priority=priority,
+        )
+        raw_body = response.get("body", "")
+        parsed_body: Optional[dict] = None
+        if len(raw_body) > 0:
+            try:
+                parsed_body = json.loads(raw_body)
+            except json.decoder.JSONDecodeError:
+                message = _build_unexpected_body_error_message(raw_body)
+                raise DiscoveryApiError(message, response)
+
+        return AsyncDiscoveryResponse(
+            client=self,
+            http_method=http_method,
+            api_url=url,
+            request_headers=request_headers,
+            request_params=params,
+            raw_body=raw_body,
+            body=parsed_body,
+            headers=dict(response["headers"]),
+            status_code=response["status"],
+            priority=priority,
+        ).validate()
+
+    async def _perform_http_request(
+        self,
+        *,
+        http_method: str = "POST",
+        url: str,
+        headers: Dict[str, str],
+        params: Dict[str, str],
+        priority: Optional[str] = None,
+    ) -> Dict[str, any]:  # type:ignore
+        """Performs an HTTP request and parses the response.
+        Returns:
+            dict {status: int, headers: Headers, body: str}
+        """
+
+        url_elements = url.split("/")
+        api_method = url_elements[-1].split("?")[0]  # remove query string
+
+        url_encoded_params: str = urlencode(params or {})
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+        if not url.lower().startswith("http"):
+            raise DiscoveryRequestError(f"Invalid URL detected: {url}")
+        request_url = url
+        request_body: Optional[bytes] = None
+        if http_method == "POST":
+            request_body = url_encoded_params.encode("utf-8")
+        elif http_method == "GET":
+            request_url = (
+                f"{url}&{url_encoded_params}"
+                if "?" in url
+                else f"{url}?{url_encoded_params}"
+            )
+        else:
+            raise DiscoveryRequestError(f"Unsupported HTTP method: {http_method}")
+
+        retry_request = RetryRequest(
+            http_method=http_method, api_method=api_method, url=url
+        )
+        retry_state = self.retry_engine.start()
+        # Retry in a loop so that sustained failures never build up the stack
+        while True:
+            if len(url_elements) >= 2:
+                await self._do_stuff_for_rate_limit_error_prevention(
+                    api_method=api_method, priority=priority
+                )
+
+            self._print_request_debug_log(
+                headers=headers,
+                http_method=http_method,
+                url=url,
+                params=params,
+            )
+
+            try:
+                resp = await self.transport.request(
+                    method=http_method,
+                    url=request_url,
+                    headers=headers,
+                    body=request_body,
+                    timeout=self.timeout,
+                )
+            except Exception as err:
+                self.rate_limiter.append_api_call_result(
+                    api_method=api_method,
+                    is_success=False,
+                )
+                sleep_duration = self.retry_engine.next_retry(
+                    state=retry_state, request=retry_request, error=err
+                )
+                if sleep_duration is None:
+                    self.logger.error(
+                        f"Failed to send a request to Slack API server: {err}"
+                    )
+                    raise err
+                self.logger.info(
+                    f"Going to retry the {api_method} API call in {round(sleep_duration, 3)} seconds "
+                    f"as the request failed ({err!r}) ..."
+                )
+                await asyncio.sleep(sleep_duration)
+                continue
+
+            # read the response body here
+            charset = resp.headers.get_content_charset() or "utf-8"
+            response_body: str = resp.body.decode(charset)
+            if resp.status < 400:
+                self._print_response_debug_log(
+                    status_code=resp.status,
+                    headers=resp.headers,
+                    body=response_body,
+                )
+                self.rate_limiter.append_api_call_result(
+                    api_method=api_method,
+                    is_success=True,
+                )
+                return {
+                    "status": resp.status,
+                    "headers": resp.headers,
+                    "body": response_body,
+                }
+
+            self.rate_limiter.append_api_call_result(
+                api_method=api_method,
+                is_success=False,
+            )
+            if resp.status == 429:
+                self._print_response_debug_log(
+                    status_code=resp.status,
+                    headers=dict(resp.headers.items()),
+                    body=response_body,
+                )
+                retry_after = resp.headers.get("retry-after")
+                # Let the rate limiter learn from this error
+                self.rate_limiter.record_rate_limited(
+                    api_method=api_method,
+                    retry_after=float(retry_after) if retry_after is not None else None,
+                )
+
+            sleep_duration = self.retry_engine.next_retry(
+                state=retry_state, request=retry_request, response=resp
+            )
+            if sleep_duration is None:
+                return {
+                    "status": resp.status,
+                    "headers": resp.headers,
+                    "body": response_body,
+                }
+            self.logger.info(
+                f"Going to sleep for {round(sleep_duration, 3)} seconds "
+                f"before retrying the {api_method} API call (status: {resp.status}) ..."
+            )
+            await asyncio.sleep(sleep_duration)
+
+    def _print_request_debug_log(
+        self,
+        *,
+        http_method: str,
+        url: str,
+        headers: dict,
+        params: dict,
+    ):
+        if self.logger.level <= logging.DEBUG:
+
+            def convert_params(values: dict) -> dict:
+                if not values or not isinstance(values, dict):
+                    return {}
+                return {
+                    k: ("(bytes)" if isinstance(v, bytes) else v)
+                    for k, v in values.items()
+                }
+
+            headers = {
+                k: "(redacted)" if k.lower() == "authorization" else v
+                for k, v in headers.items()
+            }
+            self.logger.debug(
+                f"Sending a request - {http_method} {url}, "
+                f"params: {convert_params(params)}, "
+                f"headers: {headers}"
+            )
+
+    def _print_response_debug_log(
+        self,
+        *,
+        status_code: Optional[int] = None,
+        headers: Optional[Dict[str, str]] = None,
+        body: Optional[str] = None,
+    ):
+        if status_code >= 400:
+            self.logger.error(
+                "Received the following response - "
+                f"status: {status_code}, "
+                f"headers: {dict(headers)}, "
+                f"body: {body}"
+            )
+        elif self.logger.level <= logging.DEBUG:
+            self.logger.debug(
+                "Received the following response - "
+                f"status: {status_code}, "
+                f"headers: {dict(headers)}, "
+                f"body: {body}"
+            )
+
+    def _build_request_headers(
+        self, *, token: str, additional_headers: dict
+    ) -> Dict[str, str]:
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        headers.update(self.headers)
+        if token:
+            headers.update({"Authorization": "Bearer {}".format(token)})
+        if additional_headers:
+            headers.update(additional_headers)
+        return headers
+
+    async def _do_stuff_for_rate_limit_error_prevention(
+        self,
+        *,
+        api_method: str,
+        priority: Optional[str] = None,
+    ):
+        if self.rate_limit_error_prevention_enabled is True:
+            sleep_duration = await self.rate_limiter.acquire(
+                api_method, priority or self.priority
+            )
+            if sleep_duration > 0 and self.logger.level <= logging.DEBUG:
+                self.logger.debug(
+                    "To prevent rate limited errors, "
+                    f"slept for {round(sleep_duration * 1000, 1)} milliseconds before the {api_method} API call"
+                )
+        else:
+            self.rate_limiter.append_api_call_timestamp(api_method=api_method)
+
+        if self.logger.level <= logging.DEBUG:
+            report = self.rate_limiter.generate_metrics_report()
+            self.logger.debug(f"""Rate limit metrics: {report}""")
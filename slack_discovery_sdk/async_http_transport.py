@@ -0,0 +1,281 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""asyncio-based HTTP transport layer used by AsyncBaseDiscoveryClient.
+This module is built only with asyncio streams to avoid any third-party dependencies."""
+
+import asyncio
+import email.parser
+import logging
+import ssl as ssl_module
+import time
+from collections import deque
+from http.client import BadStatusLine, HTTPMessage, RemoteDisconnected
+from ssl import SSLContext
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from .http_transport import HTTPTransportResponse  # type:ignore
+
+_STALE_CONNECTION_ERRORS = (
+    RemoteDisconnected,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+    asyncio.IncompleteReadError,
+)
+
+
+class _AsyncConnection:
+    def __init__(
+        self,
+        *,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except Exception:  # skipcq: PYL-W0703
+            pass
+
+
+class AsyncHTTPTransport:
+    """The interface AsyncBaseDiscoveryClient uses to perform HTTP requests.
+    Responses with 4xx/5xx status codes must be returned, not raised.
+    """
+
+    async def request(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[bytes],
+        timeout: float,
+    ) -> HTTPTransportResponse:
+        raise NotImplementedError()
+
+    async def close(self):
+        pass
+
+
+class AsyncPooledHTTPTransport(AsyncHTTPTransport):
+    """An HTTP/1.1 client on top of asyncio streams that keeps per-host pools of
+    keep-alive connections. A transport instance must be used within a single event loop.
+    """
+
+    DEFAULT_POOL_SIZE = 100
+    DEFAULT_IDLE_TIMEOUT = 30.0  # seconds
+    DEFAULT_STALE_CONNECTION_RETRIES = 1
+
+    ssl: Optional[SSLContext]
+    pool_size: int
+    idle_timeout: float
+    stale_connection_retries: int
+    logger: logging.Logger
+    created_connection_count: int
+    reused_connection_count: int
+
+    def __init__(
+        self,
+        *,
+        ssl: Optional[SSLContext] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        stale_connection_retries: int = DEFAULT_STALE_CONNECTION_RETRIES,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Args:
+            ssl: SSLContext used for https connections
+            pool_size: The max number of idle connections kept per host
+            idle_timeout: Idle connections older than this (in seconds) are discarded
+            stale_connection_retries: How many times a request is resent on a new connection
+                when a reused connection turns out to have been closed by the server
+            logger: Logger
+        """
+        self.ssl = ssl
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.stale_connection_retries = stale_connection_retries
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        self.created_connection_count = 0
+        self.reused_connection_count = 0
+        self._pools: Dict[Tuple[str, str, int], Deque[_AsyncConnection]] = {}
+
+    async def request(
+        self,
+        *,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[bytes],
+        timeout: float,
+    ) -> HTTPTransportResponse:
+        parsed_url = urlparse(url)
+        scheme = parsed_url.scheme.lower()
+        host = parsed_url.hostname
+        port = parsed_url.port or (443 if scheme == "https" else 80)
+        path = parsed_url.path or "/"
+        if parsed_url.query:
+            path = f"{path}?{parsed_url.query}"
+        host_header = host if parsed_url.port is None else f"{host}:{port}"
+        key = (scheme, host, port)
+
+        retries = 0
+        while True:
+            conn = self._acquire(key)
+            reused = conn is not None
+            try:
+                if conn is None:
+                    conn = await asyncio.wait_for(
+                        self._open_connection(scheme, host, port), timeout
+                    )
+                    self.created_connection_count += 1
+                else:
+                    self.reused_connection_count += 1
+                status, response_headers, response_body, will_close = (
+                    await asyncio.wait_for(
+                        self._send(
+                            conn=conn,
+                            method=method,
+                            host=host_header,
+                            path=path,
+                            headers=headers,
+                            body=body,
+                        ),
+                        timeout,
+                    )
+                )
+            except _STALE_CONNECTION_ERRORS as e:
+                if conn is not None:
+                    conn.close()
+                if reused and retries < self.stale_connection_retries:
+                    retries += 1
+                    self.logger.debug(
+                        f"Retrying a request as the kept-alive connection is no longer available ({e})"
+                    )
+                    continue
+                raise
+            except BaseException:
+                if conn is not None:
+                    conn.close()
+                raise
+
+            if will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            return HTTPTransportResponse(
+                status=status, headers=response_headers, body=response_body
+            )
+
+    async def close(self):
+        pools = list(self._pools.values())
+        self._pools.clear()
+        for pool in pools:
+            for conn in pool:
+                conn.close()
+
+    def _acquire(self, key: Tuple[str, str, int]) -> Optional[_AsyncConnection]:
+        pool = self._pools.get(key)
+        if not pool:
+            return None
+        deadline = time.monotonic() - self.idle_timeout
+        # The oldest connections are on the left side
+        while pool and pool[0].last_used < deadline:
+            pool.popleft().close()
+        while pool:
+            conn = pool.pop()
+            if not conn.reader.at_eof():
+                return conn
+            conn.close()
+        return None
+
+    def _release(self, key: Tuple[str, str, int], conn: _AsyncConnection):
+        pool = self._pools.setdefault(key, deque())
+        if len(pool) < self.pool_size:
+            conn.last_used = time.monotonic()
+            pool.append(conn)
+        else:
+            conn.close()
+
+    async def _open_connection(
+        self, scheme: str, host: str, port: int
+    ) -> _AsyncConnection:
+        if scheme == "https":
+            ssl_context = self.ssl or ssl_module.create_default_context()
+            reader, writer = await asyncio.open_connection(
+                host, port, ssl=ssl_context, server_hostname=host
+            )
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return _AsyncConnection(reader=reader, writer=writer)
+
+    @staticmethod
+    async def _send(
+        *,
+        conn: _AsyncConnection,
+        method: str,
+        host: str,
+        path: str,
+        headers: Dict[str, str],
+        body: Optional[bytes],
+    ) -> Tuple[int, HTTPMessage, bytes, bool]:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+        for name, value in headers.items():
+            if name.lower() not in ("host", "content-length"):
+                lines.append(f"{name}: {value}")
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        request_head = ("\r\n".join(lines) + "\r\n\r\n").encode("iso-8859-1")
+        conn.writer.write(request_head + body if body is not None else request_head)
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readline()
+        if not status_line:
+            raise RemoteDisconnected("Remote end closed connection without response")
+        status_line_parts = status_line.decode("iso-8859-1").rstrip("\r\n").split(" ", 2)
+        if len(status_line_parts) < 2:
+            raise BadStatusLine(status_line)
+        version, status = status_line_parts[0], status_line_parts[1]
+        header_lines = []
+        while True:
+            line = await conn.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            header_lines.append(line)
+        response_headers = email.parser.Parser(_class=HTTPMessage).parsestr(
+            b"".join(header_lines).decode("iso-8859-1")
+        )
+
+        connection_header = (response_headers.get("Connection") or "").lower()
+        will_close = connection_header == "close" or (
+            version == "HTTP/1.0" and connection_header != "keep-alive"
+        )
+        status_code = int(status)
+        if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+            return status_code, response_headers, b"", will_close
+        if (response_headers.get("Transfer-Encoding") or "").lower() == "chunked":
+            chunks = []
+            while True:
+                size_line = await conn.reader.readline()
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # Skip the trailer section
+                    while (await conn.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await conn.reader.readexactly(size))
+                await conn.reader.readexactly(2)  # CRLF
+            return status_code, response_headers, b"".join(chunks), will_close
+        content_length = response_headers.get("Content-Length")
+        if content_length is not None:
+            response_body = await conn.reader.readexactly(int(content_length))
+            return status_code, response_headers, response_body, will_close
+        # Without the length info, the body ends when the server closes the connection
+        return status_code, response_headers, await conn.reader.read(), True
@@ -0,0 +1,82 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+import asyncio
+from typing import Dict, Optional, Union
+
+from .rate_limit_support import RateLimiter  # type:ignore
+
+
+class AsyncRateLimiter:
+    """An asyncio-native wrapper of RateLimiter.
+    The traffic metrics are kept in the underlying RateLimiter, so a single RateLimiter instance
+    can be shared by both DiscoveryClient and AsyncDiscoveryClient in the same process.
+    Waiting for the next permit is done with asyncio.sleep, so it never blocks the event loop.
+    """
+
+    rate_limiter: RateLimiter
+
+    def __init__(
+        self,
+        *,
+        rate_limiter: Optional[RateLimiter] = None,
+        enterprise_id: Optional[str] = None,
+        number_of_nodes: int = 1,
+    ):
+        self.rate_limiter = (
+            rate_limiter
+            if rate_limiter is not None
+            else RateLimiter(
+                enterprise_id=enterprise_id, number_of_nodes=number_of_nodes
+            )
+        )
+
+    async def acquire(
+        self, api_method: str, priority: str = RateLimiter.PRIORITY_DEFAULT
+    ) -> float:
+        """Waits until the given API method can be called, and then records the call.
+        Args:
+            api_method: The API method name (e.g., discovery.users.list)
+            priority: One of RateLimiter.PRIORITIES
+        Returns:
+            The duration (in seconds) this coroutine waited for
+        """
+        backend = self.rate_limiter.backend
+        loop = asyncio.get_event_loop()
+        total_sleep_duration = 0.0
+        reserved = False
+        while not reserved:
+            if backend is not None and backend.blocking:
+                # Do not block the event loop while talking to a shared backend
+                sleep_duration, reserved = await loop.run_in_executor(
+                    None, self.rate_limiter.try_reserve, api_method, priority
+                )
+            else:
+                sleep_duration, reserved = self.rate_limiter.try_reserve(
+                    api_method, priority
+                )
+            if sleep_duration > 0:
+                await asyncio.sleep(sleep_duration)
+                total_sleep_duration += sleep_duration
+        self.rate_limiter.append_api_call_timestamp(api_method=api_method)
+        return total_sleep_duration
+
+    def append_api_call_timestamp(self, api_method: str):
+        self.rate_limiter.append_api_call_timestamp(api_method=api_method)
+
+    def append_api_call_result(self, api_method: str, is_success: bool):
+        self.rate_limiter.append_api_call_result(
+            api_method=api_method, is_success=is_success
+        )
+
+    def record_rate_limited(self, api_method: str, retry_after: Optional[float]):
+        self.rate_limiter.record_rate_limited(
+            api_method=api_method, retry_after=retry_after
+        )
+
+    def cleanup(self):
+        self.rate_limiter.cleanup()
+
+    def generate_metrics_report(
+        self,
+    ) -> Dict[str, Optional[Union[str, int, Dict[str, int]]]]:
+        return self.rate_limiter.generate_metrics_report()
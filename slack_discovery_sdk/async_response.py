@@ -0,0 +1,151 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""A Python module for interacting and consuming responses from Slack in asyncio apps."""
+
+import logging
+from typing import Optional
+
+from .errors import DiscoveryApiError  # type:ignore
+from .internal_utils import _next_cursor_is_present  # type:ignore
+from .response import _LATEST_OFFSET_APIS  # type:ignore
+
+
+class AsyncDiscoveryResponse:
+    """An async iterable container of response data.
+    Attributes:
+        body (dict): The json-encoded content of the response. Along
+            with the headers and status code information.
+    Methods:
+        validate: Check if the response from Slack was successful.
+        get: Retrieves any key from the response data.
+    Example:
+    ```python
+    import os
+    from slack_discovery_sdk import AsyncDiscoveryClient
+    client = AsyncDiscoveryClient(token=os.environ['SLACK_ORG_ADMIN_TOKEN'])
+    users = []
+    async for page in await client.discovery_users_list():
+        users = users + page['users']
+    ```
+    Note:
+        Any attributes or methods prefixed with _underscores are
+        intended to be "private" internal use only. They may be changed or
+        removed at anytime.
+    """
+
+    def __init__(  # type: ignore
+        self,
+        *,
+        client: "AsyncBaseDiscoveryClient",  # noqa: F821
+        http_method: str,
+        api_url: str,
+        request_headers: dict,
+        request_params: Optional[dict],
+        raw_body: str,
+        body: dict,
+        headers: dict,
+        status_code: int,
+        priority: Optional[str] = None,
+    ):
+        self.http_method = http_method
+        self.api_url = api_url
+        self.request_headers = request_headers
+        self.request_params = request_params
+        self.raw_body = raw_body
+        self.body = body
+        self.headers = headers
+        self.status_code = status_code
+        # The following pages are fetched with the same priority
+        self.priority = priority
+        self._initial_data = body
+        self._iteration = None  # for __aiter__ & __anext__
+        self._client = client
+        self._logger = logging.getLogger(__name__)
+
+    def __str__(self):
+        """Return the Response data if object is converted to a string."""
+        return f"{self.body}"
+
+    def __getitem__(self, key):
+        """Retrieves any key from the data store.
+        Returns:
+            The value from data or None.
+        """
+        return self.body.get(key, None)
+
+    def __aiter__(self):
+        """Enables the ability to iterate over the response with `async for`.
+        Note:
+            This enables Slack cursor-based and offset-based pagination.
+        Returns:
+            (AsyncDiscoveryResponse) self
+        """
+        self._iteration = 0
+        self.body = self._initial_data
+        return self
+
+    async def __anext__(self):
+        """Retrieves the next portion of results, if 'next_cursor' or 'offset' is present.
+        Returns:
+            (AsyncDiscoveryResponse) self
+                With the new response data now attached to this object.
+        Raises:
+            DiscoveryApiError: If the request to the Slack API failed.
+            StopAsyncIteration: If 'next_cursor' is not present or empty.
+        """
+        self._iteration += 1
+        if self._iteration == 1:
+            return self
+        if _next_cursor_is_present(self.body):  # skipcq: PYL-R1705
+            params = self.request_params or {}
+            # cursor
+            next_cursor = self.body.get("response_metadata", {}).get("next_cursor")
+            params.update({"cursor": next_cursor})
+            # offset for https://api.slack.com/enterprise/discovery/methods#users_list etc.
+            params.update({"offset": self.body.get("offset")})
+
+            if any(
+                [
+                    latest_offset_api in self.api_url
+                    for latest_offset_api in _LATEST_OFFSET_APIS
+                ]
+            ):
+                params.update({"latest": self.body.get("offset")})
+
+            response = await self._client.fetch_next_page(  # skipcq: PYL-W0212
+                http_method=self.http_method,
+                api_url=self.api_url,
+                headers=self.request_headers,
+                params=params,
+                priority=self.priority,
+            )
+            self.status_code = response["status_code"]
+            self.headers = response["headers"]
+            self.body = response["body"]
+            return self.validate()
+        else:
+            raise StopAsyncIteration
+
+    def get(self, key, default=None):
+        """Retrieves any key from the response data.
+        Returns:
+            The value from data or the specified default.
+        """
+        return self.body.get(key, default)
+
+    def validate(self):
+        """Check if the response from Slack was successful.
+        Returns:
+            (AsyncDiscoveryResponse)
+                This method returns it's own object. e.g. 'self'
+        Raises:
+            DiscoveryApiError: The request to the Slack API failed.
+        """
+        if (
+            self.status_code == 200
+            and self.body is not None
+            and self.body.get("ok", False)
+        ):
+            return self
+        msg = "The request to the Slack API failed."
+        raise DiscoveryApiError(message=msg, response=self)
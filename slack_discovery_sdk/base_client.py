@@ -5,16 +5,12 @@
 import json
 import logging
 import time
-import urllib
 from base64 import b64encode
-from http.client import HTTPResponse
 from logging import Logger
 from ssl import SSLContext
 from typing import Dict
 from typing import Optional
-from urllib.error import HTTPError
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen, OpenerDirector, ProxyHandler, HTTPSHandler
 
 from .errors import DiscoveryRequestError, DiscoveryApiError  # type:ignore
 from .internal_utils import (
@@ -22,9 +18,16 @@ from .internal_utils import (
     get_user_agent,
     _get_url,
     _build_unexpected_body_error_message,
+    _validate_priority,
 )  # type:ignore
-from .rate_limit_support import RateLimiter, calculate_random_jitter  # type:ignore
+from .http_transport import HTTPTransport, PooledHTTPTransport  # type:ignore
+from .rate_limit_support import RateLimiter  # type:ignore
 from .response import DiscoveryResponse  # type:ignore
+from .retry_support import (  # type:ignore
+    RateLimitErrorRetryHandler,
+    RetryEngine,
+    RetryRequest,
+)
 from .proxy_support import load_http_proxy_from_env  # type:ignore
 
 
@@ -42,6 +45,10 @@ class BaseDiscoveryClient:
     rate_limit_error_prevention_enabled: bool
     number_of_rate_limiter_enabled_nodes: int
     rate_limiter: RateLimiter
+    retry_engine: RetryEngine
+    # The default priority of the API calls (one of RateLimiter.PRIORITIES)
+    priority: str
+    transport: HTTPTransport
 
     def __init__(
         self,
@@ -59,6 +66,9 @@ class BaseDiscoveryClient:
         rate_limit_error_prevention_enabled: bool = True,
         number_of_rate_limiter_enabled_nodes: int = 1,
         rate_limiter: Optional[RateLimiter] = None,
+        transport: Optional[HTTPTransport] = None,
+        retry_engine: Optional[RetryEngine] = None,
+        priority: str = RateLimiter.PRIORITY_DEFAULT,
     ):
         self.token = None if token is None else token.strip()
         self.base_url = base_url
@@ -79,6 +89,8 @@ class BaseDiscoveryClient:
             if env_variable is not None:
                 self.proxy = env_variable
 
+        _validate_priority(priority)
+        self.priority = priority
         self.rate_limit_error_prevention_enabled = rate_limit_error_prevention_enabled
         self.number_of_rate_limiter_enabled_nodes = number_of_rate_limiter_enabled_nodes
         self.rate_limiter = (
@@ -90,6 +102,25 @@ class BaseDiscoveryClient:
             )
         )
 
+        if retry_engine is not None:
+            self.retry_engine = retry_engine
+        else:
+            # By default, only rate limited errors are retried when the error prevention is enabled
+            self.retry_engine = RetryEngine(
+                handlers=[RateLimitErrorRetryHandler()]
+                if rate_limit_error_prevention_enabled
+                else []
+            )
+
+        if transport is not None:
+            self.transport = transport
+        else:
+            # Built only once per client to reuse keep-alive connections
+            # (and CONNECT tunnels when a proxy is set) across API calls and threads
+            self.transport = PooledHTTPTransport(
+                ssl=self.ssl, proxy=self.proxy, logger=self.logger
+            )
+
     def api_call(  # skipcq: PYL-R1710
         self,
         api_method: str,
@@ -145,6 +176,13 @@ class BaseDiscoveryClient:
             param_token = params.pop("token")
             if param_token is not None:
                 token = param_token
+        # The priority of this call (e.g., realtime for DLP enforcement) in the rate limiter
+        priority = self.priority
+        if "priority" in params:
+            param_priority = params.pop("priority")
+            if param_priority is not None:
+                _validate_priority(param_priority)
+                priority = param_priority
         # if param is None, do not include it in API call
         cleansed_params = {k: v for k, v in params.items() if v is not None}
         return self._urllib_api_call(
@@ -153,6 +191,7 @@ class BaseDiscoveryClient:
             url=api_url,
             params=cleansed_params or {},
             additional_headers=headers or {},
+            priority=priority,
         )
 
     def fetch_next_page(
@@ -161,6 +200,7 @@ class BaseDiscoveryClient:
         api_url: str,
         headers: Dict[str, str],
         params: Dict[str, str],
+        priority: Optional[str] = None,
     ) -> Dict[str, any]:  # type:ignore
         """This method is supposed to be used only for DiscoveryResponse pagination
         You can paginate using Python's for iterator as below:
@@ -172,6 +212,7 @@ class BaseDiscoveryClient:
             url=api_url,
             headers=headers or {},
             params=params or {},
+            priority=priority,
         )
         return {
             "status_code": int(response["status"]),
@@ -187,6 +228,7 @@ class BaseDiscoveryClient:
         url: str,
         params: Dict[str, str],
         additional_headers: Dict[str, str],
+        priority: Optional[str] = None,
     ) -> DiscoveryResponse:
         """Performs a Slack API request and returns the result.
         Args:
@@ -194,6 +236,7 @@ class BaseDiscoveryClient:
             url: Complete URL (e.g., https://slack.com/api/discovery.enterprise.info)
             params: Form body params
             additional_headers: Request headers to append
+            priority: The priority in the rate limiter (default: the client's priority)
         Returns:
             API response
         """
@@ -209,6 +252,7 @@ class BaseDiscoveryClient:
             url=url,
             headers=request_headers,
             params=params,
+            priority=priority,
         )
         raw_body = response.get("body", "")
         parsed_body: Optional[dict] = None
@@ -229,6 +273,7 @@ class BaseDiscoveryClient:
             body=parsed_body,
             headers=dict(response["headers"]),
             status_code=response["status"],
+            priority=priority,
         ).validate()
 
     def _perform_urllib_http_request(
@@ -238,6 +283,7 @@ class BaseDiscoveryClient:
         url: str,
         headers: Dict[str, str],
         params: Dict[str, str],
+        priority: Optional[str] = None,
     ) -> Dict[str, any]:  # type:ignore
         """Performs an HTTP request and parses the response.
         Args:
@@ -250,129 +296,131 @@ class BaseDiscoveryClient:
         """
 
         url_elements = url.split("/")
-        if len(url_elements) >= 2:
-            api_method = url_elements[-1].split("?")[0]  # remove query string
-            self._do_stuff_for_rate_limit_error_prevention(api_method=api_method)
-
-        self._print_request_debug_log(
-            headers=headers,
-            http_method=http_method,
-            url=url,
-            params=params,
-        )
+        api_method = url_elements[-1].split("?")[0]  # remove query string
 
         url_encoded_params: str = urlencode(params or {})
         headers["Content-Type"] = "application/x-www-form-urlencoded"
 
         # NOTE: Intentionally ignore the `http_verb` here
         # Slack APIs accepts any API method requests with POST methods
-        try:
-            # urllib not only opens http:// or https:// URLs, but also ftp:// and file://.
-            # With this it might be possible to open local files on the executing machine
-            # which might be a security risk if the URL to open can be manipulated by an external user.
-            # (BAN-B310)
-            if url.lower().startswith("http"):
-                if http_method == "POST":
-                    req = Request(
-                        method="POST",
-                        url=url,
-                        data=url_encoded_params.encode("utf-8"),
-                        headers=headers,
-                    )
-                elif http_method == "GET":
-                    url = (
-                        f"{url}&{url_encoded_params}"
-                        if "?" in url
-                        else f"{url}?{url_encoded_params}"
-                    )
-                    req = Request(method="GET", url=url, headers=headers)
-                else:
-                    raise DiscoveryRequestError(
-                        f"Unsupported HTTP method: {http_method}"
-                    )
 
-                opener: Optional[OpenerDirector] = None
-                if self.proxy is not None:
-                    if isinstance(self.proxy, str):
-                        opener = urllib.request.build_opener(
-                            ProxyHandler({"http": self.proxy, "https": self.proxy}),
-                            HTTPSHandler(context=self.ssl),
-                        )
-                    else:
-                        raise DiscoveryRequestError(
-                            f"Invalid proxy detected: {self.proxy} must be a str value"
-                        )
+        # urllib not only opens http:// or https:// URLs, but also ftp:// and file://.
+        # With this it might be possible to open local files on the executing machine
+        # which might be a security risk if the URL to open can be manipulated by an external user.
+        # (BAN-B310)
+        if not url.lower().startswith("http"):
+            raise DiscoveryRequestError(f"Invalid URL detected: {url}")
+        request_url = url
+        request_body: Optional[bytes] = None
+        if http_method == "POST":
+            request_body = url_encoded_params.encode("utf-8")
+        elif http_method == "GET":
+            request_url = (
+                f"{url}&{url_encoded_params}"
+                if "?" in url
+                else f"{url}?{url_encoded_params}"
+            )
+        else:
+            raise DiscoveryRequestError(f"Unsupported HTTP method: {http_method}")
+
+        retry_request = RetryRequest(
+            http_method=http_method, api_method=api_method, url=url
+        )
+        retry_state = self.retry_engine.start()
+        # Retry in a loop so that sustained failures never build up the stack
+        while True:
+            if len(url_elements) >= 2:
+                self._do_stuff_for_rate_limit_error_prevention(
+                    api_method=api_method, priority=priority
+                )
+
+            self._print_request_debug_log(
+                headers=headers,
+                http_method=http_method,
+                url=url,
+                params=params,
+            )
 
-                # NOTE: BAN-B310 is already checked above
-                resp: Optional[HTTPResponse] = None
-                if opener:
-                    resp = opener.open(req, timeout=self.timeout)  # skipcq: BAN-B310
-                else:
-                    resp = urlopen(  # skipcq: BAN-B310
-                        req, context=self.ssl, timeout=self.timeout
+            try:
+                resp = self.transport.request(
+                    method=http_method,
+                    url=request_url,
+                    headers=headers,
+                    body=request_body,
+                    timeout=self.timeout,
+                )
+            except Exception as err:
+                self.rate_limiter.append_api_call_result(
+                    api_method=api_method,
+                    is_success=False,
+                )
+                sleep_duration = self.retry_engine.next_retry(
+                    state=retry_state, request=retry_request, error=err
+                )
+                if sleep_duration is None:
+                    self.logger.error(
+                        f"Failed to send a request to Slack API server: {err}"
                     )
+                    raise err
+                self.logger.info(
+                    f"Going to retry the {api_method} API call in {round(sleep_duration, 3)} seconds "
+                    f"as the request failed ({err!r}) ..."
+                )
+                time.sleep(sleep_duration)
+                continue
 
-                charset = resp.headers.get_content_charset() or "utf-8"
-                url_encoded_params: str = resp.read().decode(
-                    charset
-                )  # read the response body here
+            # read the response body here
+            charset = resp.headers.get_content_charset() or "utf-8"
+            response_body: str = resp.body.decode(charset)
+            if resp.status < 400:
                 self._print_response_debug_log(
-                    status_code=resp.code,
+                    status_code=resp.status,
                     headers=resp.headers,
-                    body=url_encoded_params,
+                    body=response_body,
                 )
                 self.rate_limiter.append_api_call_result(
                     api_method=api_method,
                     is_success=True,
                 )
                 return {
-                    "status": resp.code,
+                    "status": resp.status,
                     "headers": resp.headers,
-                    "body": url_encoded_params,
+                    "body": response_body,
                 }
-            raise DiscoveryRequestError(f"Invalid URL detected: {url}")
-        except HTTPError as e:
+
             self.rate_limiter.append_api_call_result(
                 api_method=api_method,
                 is_success=False,
             )
-            resp = {"status": e.code, "headers": e.headers}
-            # read the response body here
-            charset = e.headers.get_content_charset() or "utf-8"
-            url_encoded_params: str = e.read().decode(charset)
-            if e.code == 429:
+            if resp.status == 429:
                 self._print_response_debug_log(
-                    status_code=e.code,
-                    headers=dict(e.headers.items()),
-                    body=url_encoded_params,
+                    status_code=resp.status,
+                    headers=dict(resp.headers.items()),
+                    body=response_body,
                 )
                 # for compatibility with aiohttp
-                resp["headers"]["Retry-After"] = resp["headers"]["retry-after"]
-
-                if self.rate_limit_error_prevention_enabled is True:
-                    sleep_seconds = int(resp["headers"]["retry-after"])
-                    log_message = f"Going to sleep for {sleep_seconds} seconds as this client got a rate limited error..."
-                    self.logger.info(log_message)
-                    time.sleep(sleep_seconds + calculate_random_jitter(factor=5.0))
-
-                    # Recursively call this method
-                    return self._perform_urllib_http_request(
-                        http_method=http_method,
-                        url=url,
-                        headers=headers,
-                        params=params,
-                    )
-
-            resp["body"] = url_encoded_params
-            return resp
+                resp.headers["Retry-After"] = resp.headers["retry-after"]
+                retry_after = resp.headers.get("retry-after")
+                # Let the rate limiter learn from this error
+                self.rate_limiter.record_rate_limited(
+                    api_method=api_method,
+                    retry_after=float(retry_after) if retry_after is not None else None,
+                )
 
-        except Exception as err:
-            self.rate_limiter.append_api_call_result(
-                api_method=api_method,
-                is_success=False,
+            sleep_duration = self.retry_engine.next_retry(
+                state=retry_state, request=retry_request, response=resp
             )
-            self.logger.error(f"Failed to send a request to Slack API server: {err}")
-            raise err
+            if sleep_duration is None:
+                return {
+                    "status": resp.status,
+                    "headers": resp.headers,
+                    "body": response_body,
+                }
+            self.logger.info(
+                f"Going to sleep for {round(sleep_duration, 3)} seconds "
+                f"before retrying the {api_method} API call (status: {resp.status}) ..."
+            )
+            time.sleep(sleep_duration)
 
     def _print_request_debug_log(
         self,
@@ -439,27 +487,33 @@ class BaseDiscoveryClient:
         self,
         *,
         api_method: str,
+        priority: Optional[str] = None,
     ):
         if self.rate_limit_error_prevention_enabled is True:
-            # Check the current traffic
-            sleep_duration: float = self.rate_limiter.calculate_sleep_duration(
-                api_method
-            )
-            if self.logger.level <= logging.DEBUG:
-                report = self.rate_limiter.generate_metrics_report()
-                self.logger.debug(f"""Rate limit metrics: {report}""")
-
-            if sleep_duration > 0:
+            priority = priority or self.priority
+            reserved = False
+            # Lower priority calls may have to wait for a while and then try again
+            while not reserved:
+                # Check the current traffic
+                sleep_duration, reserved = self.rate_limiter.try_reserve(
+                    api_method, priority
+                )
                 if self.logger.level <= logging.DEBUG:
-                    sleep_time = f"{round(sleep_duration * 1000, 1)} milliseconds"
-                    if sleep_duration >= 1:
-                        sleep_time = f"{round(sleep_duration, 2)} seconds"
-                    log_message = (
-                        "To prevent rate limited errors, "
-                        f"going to sleep for {sleep_time} before the next {api_method} API call ..."
-                    )
-                    self.logger.debug(log_message)
-                time.sleep(sleep_duration)
+                    report = self.rate_limiter.generate_metrics_report()
+                    self.logger.debug(f"""Rate limit metrics: {report}""")
+
+                if sleep_duration > 0:
+                    if self.logger.level <= logging.DEBUG:
+                        sleep_time = f"{round(sleep_duration * 1000, 1)} milliseconds"
+                        if sleep_duration >= 1:
+                            sleep_time = f"{round(sleep_duration, 2)} seconds"
+                        log_message = (
+                            "To prevent rate limited errors, "
+                            f"going to sleep for {sleep_time} before the next {api_method} API call "
+                            f"(priority: {priority}) ..."
+                        )
+                        self.logger.debug(log_message)
+                    time.sleep(sleep_duration)
         else:
             # Periodically,maintain the metrics data to avoid confusion
             if len(self.rate_limiter.org_call_histories_in_last_second) % 10:
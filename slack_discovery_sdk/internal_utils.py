@@ -5,6 +5,8 @@ import sys
 from typing import Dict, Union, Optional, Any
 from urllib.parse import urljoin
 
+from .errors import DiscoveryRequestError  # type:ignore
+from .rate_limit_support import RateLimiter  # type:ignore
 from .version import __version__  # type:ignore
 
 
@@ -85,6 +87,13 @@ def _build_unexpected_body_error_message(body: str) -> str:
     return message
 
 
+def _validate_priority(priority: str):
+    if priority not in RateLimiter.PRIORITIES:
+        raise DiscoveryRequestError(
+            f"Unknown priority: {priority} (must be one of {', '.join(RateLimiter.PRIORITIES)})"
+        )
+
+
 def get_random_string(length: int = 10) -> str:
     all_ascii_lowercase_chars = string.ascii_lowercase
     random_string = "".join(
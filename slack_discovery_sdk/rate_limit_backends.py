@@ -0,0 +1,589 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""Backends that keep the permit schedule of RateLimiter.
+With a shared backend, all the processes (and hosts) draw their permits from one real org-wide budget
+instead of estimating the total traffic by multiplying the local traffic by the number of nodes.
+
+- InMemoryRateLimiterBackend: shared by the threads in a single process
+- FileLockRateLimiterBackend: shared by the processes on a single host
+- SocketRateLimiterBackend: shared by multiple hosts through a RateLimitCoordinator process
+
+Example:
+```
+# on the coordinator host
+python -m slack_discovery_sdk.rate_limit_backends --host 0.0.0.0 --port 7070
+```
+```python
+from slack_discovery_sdk import DiscoveryClient
+from slack_discovery_sdk.rate_limit_backends import SocketRateLimiterBackend
+from slack_discovery_sdk.rate_limit_support import RateLimiter
+rate_limiter = RateLimiter(backend=SocketRateLimiterBackend(host="10.0.0.10", port=7070))
+client = DiscoveryClient(token=token, rate_limiter=rate_limiter)
+```
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import socket
+import socketserver
+import threading
+import time
+from bisect import bisect_right, insort
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .errors import DiscoveryRequestError  # type:ignore
+
+
+# Tolerance for the rounding errors in comparing permit times (wall clock times need a microsecond)
+_EPSILON = 1e-6
+
+
+def _align(permit: float, now: float, org_emission_interval: float) -> float:
+    """Aligns a future permit to the grid of org_emission_interval.
+    Without this, permits reserved ahead at a method's own pace leave gaps shorter than
+    two org_emission_intervals between them, which no other call can use.
+    """
+    if permit <= now:
+        return permit
+    return (
+        math.ceil(permit / org_emission_interval - _EPSILON * 1000)
+        * org_emission_interval
+    )
+
+
+class PermitSchedule:
+    """The permit schedule based on the generic cell rate algorithm (GCRA).
+    Org-wide permits are kept at least org_emission_interval apart. Each API method has
+    the theoretical arrival time (TAT) of its next permit, which advances by api_method_emission_interval.
+    Permits for slow methods (e.g., search) can be reserved in the future,
+    and the gaps between the reserved permits are still usable by other methods.
+    """
+
+    # The reserved permit times for the org-wide budget, in ascending order
+    org_permits: List[float]
+    # key: method name to the theoretical arrival time of the next permit
+    api_method_theoretical_arrival_times: Dict[str, float]
+    # key: priority name to the theoretical arrival time of the next permit
+    # for the traffic with higher priorities than it
+    priority_theoretical_arrival_times: Dict[str, float]
+    # key: priority name to the time until which the traffic with the priority is regarded as waiting
+    priority_active_until: Dict[str, float]
+
+    def __init__(
+        self,
+        *,
+        org_permits: Optional[List[float]] = None,
+        api_method_theoretical_arrival_times: Optional[Dict[str, float]] = None,
+        priority_theoretical_arrival_times: Optional[Dict[str, float]] = None,
+        priority_active_until: Optional[Dict[str, float]] = None,
+    ):
+        self.org_permits = sorted(org_permits or [])
+        self.api_method_theoretical_arrival_times = dict(
+            api_method_theoretical_arrival_times or {}
+        )
+        self.priority_theoretical_arrival_times = dict(
+            priority_theoretical_arrival_times or {}
+        )
+        self.priority_active_until = dict(priority_active_until or {})
+
+    def reserve(
+        self,
+        *,
+        now: float,
+        api_method: str,
+        org_emission_interval: float,
+        api_method_emission_interval: float,
+        api_method_burst_tolerance: float = 0.0,
+    ) -> float:
+        """Reserves the earliest permit for the API method.
+        Returns:
+            The duration (in seconds) until the reserved permit
+        """
+        sleep_duration, _ = self.try_reserve(
+            now=now,
+            api_method=api_method,
+            org_emission_interval=org_emission_interval,
+            api_method_emission_interval=api_method_emission_interval,
+            api_method_burst_tolerance=api_method_burst_tolerance,
+        )
+        return sleep_duration
+
+    def try_reserve(
+        self,
+        *,
+        now: float,
+        api_method: str,
+        org_emission_interval: float,
+        api_method_emission_interval: float,
+        api_method_burst_tolerance: float = 0.0,
+        priority_emission_intervals: Optional[Dict[str, float]] = None,
+        priority_burst_tolerance: float = 0.0,
+        priority: Optional[str] = None,
+        horizon: Optional[float] = None,
+    ) -> Tuple[float, bool]:
+        """Reserves the earliest permit for the API method if it is within the horizon.
+        Traffic with a short horizon (e.g., bulk exports) takes only the permits close to now,
+        so the permits further ahead are left to traffic with a longer horizon (e.g., urgent tombstones).
+        To keep lower priority traffic from being starved, the traffic with higher priorities
+        is limited by priority_emission_intervals while the lower priority traffic is waiting.
+        Args:
+            now: The current time
+            api_method: The API method name
+            org_emission_interval: The min interval between any two permits
+            api_method_emission_interval: The min interval between two permits for the API method
+            api_method_burst_tolerance: How much earlier than its TAT the API method can be called
+            priority_emission_intervals: key: a lower priority name to the min interval between two permits
+                for all the traffic with higher priorities than it, which is applied while it is waiting
+            priority_burst_tolerance: How much earlier than their TATs the priority limits can be exceeded
+            priority: The priority of this call, which is regarded as waiting until it gets a permit
+            horizon: How far ahead (in seconds) a permit can be reserved. None means no limit.
+        Returns:
+            The duration (in seconds) until the reserved permit and True,
+            or the duration to wait before trying again and False if no permit is available within the horizon
+        """
+        # The limits for the lower priorities that are not waiting do not apply
+        priority_emission_intervals = {
+            k: v
+            for k, v in (priority_emission_intervals or {}).items()
+            if self.priority_active_until.get(k, now) > now
+        }
+        # The earliest time allowed by the API method's budget
+        theoretical_arrival_time = max(
+            now, self.api_method_theoretical_arrival_times.get(api_method, now)
+        )
+        permit = max(now, theoretical_arrival_time - api_method_burst_tolerance)
+        # ... and by the limits for the waiting lower priority traffic
+        for lower_priority in priority_emission_intervals.keys():
+            permit = max(
+                permit,
+                self.priority_theoretical_arrival_times.get(lower_priority, now)
+                - priority_burst_tolerance,
+            )
+        # The earliest time on or after that, which is also allowed by the org-wide budget
+        org_permits = self.org_permits
+        del org_permits[: bisect_right(org_permits, now - org_emission_interval)]
+        permit = _align(permit, now, org_emission_interval)
+        index = bisect_right(org_permits, permit - org_emission_interval + _EPSILON)
+        while (
+            index < len(org_permits)
+            and org_permits[index] < permit + org_emission_interval - _EPSILON
+        ):
+            permit = _align(
+                org_permits[index] + org_emission_interval, now, org_emission_interval
+            )
+            index = bisect_right(
+                org_permits, permit - org_emission_interval + _EPSILON, index
+            )
+        reserved = horizon is None or permit - now <= horizon
+        # Leave the permits beyond the horizon to higher priority traffic
+        sleep_duration = (
+            permit - now if reserved else max(horizon, permit - now - horizon)
+        )
+        if priority is not None:
+            # Give the priority a second of grace to come back after the sleep
+            self.priority_active_until[priority] = max(
+                self.priority_active_until.get(priority, now),
+                now + sleep_duration + 1.0,
+            )
+        if reserved:
+            insort(org_permits, permit)
+            self.api_method_theoretical_arrival_times[api_method] = (
+                max(theoretical_arrival_time, permit) + api_method_emission_interval
+            )
+            for lower_priority, interval in priority_emission_intervals.items():
+                self.priority_theoretical_arrival_times[lower_priority] = (
+                    max(
+                        self.priority_theoretical_arrival_times.get(
+                            lower_priority, now
+                        ),
+                        permit,
+                    )
+                    + interval
+                )
+        # Arrival times in the past no longer affect the schedule
+        for arrival_times in (
+            self.api_method_theoretical_arrival_times,
+            self.priority_theoretical_arrival_times,
+            self.priority_active_until,
+        ):
+            for k in [k for k, v in arrival_times.items() if v <= now]:
+                del arrival_times[k]
+        return sleep_duration, reserved
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "org_permits": self.org_permits,
+            "api_method_theoretical_arrival_times": self.api_method_theoretical_arrival_times,
+            "priority_theoretical_arrival_times": self.priority_theoretical_arrival_times,
+            "priority_active_until": self.priority_active_until,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "PermitSchedule":
+        return PermitSchedule(
+            org_permits=d.get("org_permits"),
+            api_method_theoretical_arrival_times=d.get(
+                "api_method_theoretical_arrival_times"
+            ),
+            priority_theoretical_arrival_times=d.get(
+                "priority_theoretical_arrival_times"
+            ),
+            priority_active_until=d.get("priority_active_until"),
+        )
+
+
+class RateLimiterBackend:
+    """The interface RateLimiter uses to reserve permits."""
+
+    # True if reserve can block for a while on I/O, such as file locks and sockets
+    blocking: bool = False
+
+    def reserve(
+        self,
+        *,
+        api_method: str,
+        org_emission_interval: float,
+        api_method_emission_interval: float,
+        api_method_burst_tolerance: float = 0.0,
+    ) -> float:
+        """Reserves the earliest permit for the API method.
+        Returns:
+            The duration (in seconds) until the reserved permit
+        """
+        sleep_duration, _ = self.try_reserve(
+            api_method=api_method,
+            org_emission_interval=org_emission_interval,
+            api_method_emission_interval=api_method_emission_interval,
+            api_method_burst_tolerance=api_method_burst_tolerance,
+        )
+        return sleep_duration
+
+    def try_reserve(
+        self,
+        *,
+        api_method: str,
+        org_emission_interval: float,
+        api_method_emission_interval: float,
+        api_method_burst_tolerance: float = 0.0,
+        priority_emission_intervals: Optional[Dict[str, float]] = None,
+        priority_burst_tolerance: float = 0.0,
+        priority: Optional[str] = None,
+        horizon: Optional[float] = None,
+    ) -> Tuple[float, bool]:
+        """Reserves the earliest permit for the API method if it is within the horizon.
+        See PermitSchedule.try_reserve for the details.
+        Returns:
+            The duration (in seconds) until the reserved permit and True,
+            or the duration to wait before trying again and False
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class InMemoryRateLimiterBackend(RateLimiterBackend):
+    """Keeps the schedule in the memory of this process."""
+
+    clock: Callable[[], float]
+    schedule: PermitSchedule
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.schedule = PermitSchedule()
+        self._lock = Lock()
+
+    def try_reserve(
+        self,
+        *,
+        api_method: str,
+        org_emission_interval: float,
+        api_method_emission_interval: float,
+        api_method_burst_tolerance: float = 0.0,
+        priority_emission_intervals: Optional[Dict[str, float]] = None,
+        priority_burst_tolerance: float = 0.0,
+        priority: Optional[str] = None,
+        horizon: Optional[float] = None,
+    ) -> Tuple[float, bool]:
+        with self._lock:
+            return self.schedule.try_reserve(
+                now=self.clock(),
+                api_method=api_method,
+                org_emission_interval=org_emission_interval,
+                api_method_emission_interval=api_method_emission_interval,
+                api_method_burst_tolerance=api_method_burst_tolerance,
+                priority_emission_intervals=priority_emission_intervals,
+                priority_burst_tolerance=priority_burst_tolerance,
+                priority=priority,
+                horizon=horizon,
+            )
+
+
+class FileLockRateLimiterBackend(RateLimiterBackend):
+    """Keeps the schedule in a JSON file, which is exclusively locked (flock) while reserving a permit.
+    All the processes on the same host that use the same file share a single budget.
+    This backend is available only on POSIX platforms.
+    """
+
+    blocking = True
+
+    path: str
+    clock: Callable[[], float]
+    logger: logging.Logger
+
+    def __init__(
+        self,
+        *,
+        path: str,
+        # The wall clock is used by default so that the schedule in the file is still valid after reboots
+        clock: Callable[[], float] = time.time,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Args:
+            path: The file path of the schedule. The file is created if it does not exist.
+            clock: The clock function, which must be shared by all the processes
+            logger: Logger
+        """
+        import fcntl  # not available on Windows
+
+        self._fcntl = fcntl
+        self.path = path
+        self.clock = clock
+        self.logger = logger if logger is not None else logging.getLogger(__name__)
+        # Serializes the threads in this process before taking the file lock
+        self._lock = Lock()
+
+    def try_reserve(
+        self,
+        *,
+        api_method: str,
+        org_emission_interval: float,
+        api_method_emission_interval: float,
+        api_method_burst_tolerance: float = 0.0,
+        priority_emission_intervals: Optional[Dict[str, float]] = None,
+        priority_burst_tolerance: float = 0.0,
+        priority: Optional[str] = None,
+        horizon: Optional[float] = None,
+    ) -> Tuple[float, bool]:
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "r+", encoding="utf-8") as f:
+                self._fcntl.flock(f.fileno(), self._fcntl.LOCK_EX)
+                try:
+                    schedule = self._load(f.read())
+                    result = schedule.try_reserve(
+                        now=self.clock(),
+                        api_method=api_method,
+                        org_emission_interval=org_emission_interval,
+                        api_method_emission_interval=api_method_emission_interval,
+                        api_method_burst_tolerance=api_method_burst_tolerance,
+                        priority_emission_intervals=priority_emission_intervals,
+                        priority_burst_tolerance=priority_burst_tolerance,
+                        priority=priority,
+                        horizon=horizon,
+                    )
+                    if result[1]:
+                        f.seek(0)
+                        f.truncate()
+                        f.write(json.dumps(schedule.to_dict()))
+                        f.flush()
+                    return result
+                finally:
+                    self._fcntl.flock(f.fileno(), self._fcntl.LOCK_UN)
+
+    def _load(self, data: str) -> PermitSchedule:
+        if not data:
+            return PermitSchedule()
+        try:
+            return PermitSchedule.from_dict(json.loads(data))
+        except ValueError as e:
+            self.logger.warning(
+                f"Discarded the broken rate limiter schedule in {self.path} ({e})"
+            )
+            return PermitSchedule()
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+    server: "RateLimitCoordinator"
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                horizon = request.get("horizon")
+                sleep_duration, reserved = self.server.backend.try_reserve(
+                    api_method=request["api_method"],
+                    org_emission_interval=float(request["org_emission_interval"]),
+                    api_method_emission_interval=float(
+                        request["api_method_emission_interval"]
+                    ),
+                    api_method_burst_tolerance=float(
+                        request.get("api_method_burst_tolerance", 0.0)
+                    ),
+                    priority_emission_intervals={
+                        k: float(v)
+                        for k, v in (
+                            request.get("priority_emission_intervals") or {}
+                        ).items()
+                    },
+                    priority_burst_tolerance=float(
+                        request.get("priority_burst_tolerance", 0.0)
+                    ),
+                    priority=request.get("priority"),
+                    horizon=float(horizon) if horizon is not None else None,
+                )
+                response = {"sleep_duration": sleep_duration, "reserved": reserved}
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"error": f"invalid request: {e}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class RateLimitCoordinator(socketserver.ThreadingTCPServer):
+    """A TCP server that keeps the single permit schedule for SocketRateLimiterBackend clients.
+    The protocol is newline-delimited JSON; each request line is answered with a response line.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    backend: InMemoryRateLimiterBackend
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            host: The host to listen on
+            port: The port to listen on (0 lets the OS choose a free port)
+            clock: The clock function of the coordinator
+        """
+        super().__init__((host, port), _CoordinatorHandler)
+        self.backend = InMemoryRateLimiterBackend(clock=clock)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[0], self.server_address[1]
+
+    def start(self) -> "RateLimitCoordinator":
+        """Starts serving in a daemon thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class SocketRateLimiterBackend(RateLimiterBackend):
+    """Reserves permits from a RateLimitCoordinator, which can be shared by multiple hosts.
+    The returned durations are relative, so the clocks of the hosts do not have to be synchronized.
+    """
+
+    blocking = True
+
+    host: str
+    port: int
+    timeout: float
+
+    def __init__(self, *, host: str, port: int, timeout: float = 10):
+        """
+        Args:
+            host: The host of the coordinator
+            port: The port of the coordinator
+            timeout: The timeout (in seconds) for connecting to and receiving from the coordinator
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._lock = Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader: Optional[Any] = None
+
+    def try_reserve(
+        self,
+        *,
+        api_method: str,
+        org_emission_interval: float,
+        api_method_emission_interval: float,
+        api_method_burst_tolerance: float = 0.0,
+        priority_emission_intervals: Optional[Dict[str, float]] = None,
+        priority_burst_tolerance: float = 0.0,
+        priority: Optional[str] = None,
+        horizon: Optional[float] = None,
+    ) -> Tuple[float, bool]:
+        request = json.dumps(
+            {
+                "api_method": api_method,
+                "org_emission_interval": org_emission_interval,
+                "api_method_emission_interval": api_method_emission_interval,
+                "api_method_burst_tolerance": api_method_burst_tolerance,
+                "priority_emission_intervals": priority_emission_intervals,
+                "priority_burst_tolerance": priority_burst_tolerance,
+                "priority": priority,
+                "horizon": horizon,
+            }
+        ).encode("utf-8")
+        with self._lock:
+            try:
+                line = self._send(request)
+            except OSError:
+                # The kept connection may have been closed by the coordinator; retry once
+                self._disconnect()
+                line = self._send(request)
+        response = json.loads(line)
+        if "error" in response:
+            raise DiscoveryRequestError(
+                f"The rate limit coordinator returned an error: {response['error']}"
+            )
+        return float(response["sleep_duration"]), bool(response.get("reserved", True))
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def _send(self, request: bytes) -> bytes:
+        if self._sock is None:
+            self._sock = socket.create_connection(
+                (self.host, self.port), timeout=self.timeout
+            )
+            self._reader = self._sock.makefile("rb")
+        self._sock.sendall(request + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionResetError(
+                "The rate limit coordinator closed the connection"
+            )
+        return line
+
+    def _disconnect(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Runs a rate limit coordinator for SocketRateLimiterBackend"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    args = parser.parse_args()
+    with RateLimitCoordinator(host=args.host, port=args.port) as coordinator:
+        coordinator.serve_forever()
@@ -1,9 +1,17 @@
 # Copyright 2021, Slack Technologies, LLC. All rights reserved.
 
+import json
+import os
 import random
 import time
+from collections import deque
 from threading import Lock
-from typing import List, Dict, Optional, Union
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple, Union
+
+from .rate_limit_backends import (  # type:ignore
+    InMemoryRateLimiterBackend,
+    RateLimiterBackend,
+)
 
 
 class RateLimiter:
@@ -16,21 +24,50 @@ class RateLimiter:
 
     MAX_REQUESTS_PER_SECOND_IN_ORG = 30
     MAX_REQUESTS_PER_MINUTE_FOR_API_METHOD = 1200
+    DEFAULT_MAX_UTILIZATION = 0.95
+    # AIMD (additive increase / multiplicative decrease) parameters for the adaptive mode
+    DEFAULT_ADAPTIVE_DECREASE_FACTOR = 0.7
+    DEFAULT_ADAPTIVE_INCREASE_RATIO = 0.05
+    MIN_LEARNED_REQUESTS_PER_MINUTE = 1.0
     DEFAULT_MAX_REQUESTS_PER_MINUTE_FOR_EACH_API_METHOD = {
         "discovery.conversations.search": 6  # as of 2021-08
     }
+    # The priorities of API calls, from the highest to the lowest
+    PRIORITY_REALTIME = "realtime"  # e.g., DLP enforcement such as tombstoning messages
+    PRIORITY_DEFAULT = "default"
+    PRIORITY_BULK = "bulk"  # e.g., eDiscovery exports
+    PRIORITIES = (PRIORITY_REALTIME, PRIORITY_DEFAULT, PRIORITY_BULK)
+    # key: priority to the share of the org-wide budget guaranteed to it while it is waiting
+    DEFAULT_PRIORITY_MIN_SHARES = {PRIORITY_DEFAULT: 0.2, PRIORITY_BULK: 0.1}
+    # key: priority to how far ahead (in seconds) its permits can be reserved (None: no limit)
+    DEFAULT_PRIORITY_HORIZONS = {
+        PRIORITY_REALTIME: None,
+        PRIORITY_DEFAULT: 0.5,
+        PRIORITY_BULK: 0.1,
+    }
+    PRIORITY_BURST_TOLERANCE = 1.0
 
     enterprise_id: Optional[str]
     number_of_nodes: int
-    # list of timestamps
-    org_call_histories_in_last_second: List[float]
-    # key: method name (discovery.enterprise.info) to list of timestamps
-    api_method_call_histories_in_last_minute: Dict[str, List[float]]
+    max_requests_per_minute_for_each_api_method: Dict[str, int]
     # key: method name (discovery.enterprise.info) to count
     api_method_successful_call_counts: Dict[str, int]
     api_method_failed_call_counts: Dict[str, int]
-    max_requests_per_minute_for_each_api_method: Dict[str, int]
+    # monotonic clock function, which can be replaced for testing
+    clock: Callable[[], float]
     lock: Lock
+    # When a backend is given, permits are reserved from it instead of estimating the traffic
+    backend: Optional[RateLimiterBackend]
+    max_utilization: float
+    # Whether the per-method limits are learned from 429 responses
+    adaptive: bool
+    adaptive_decrease_factor: float
+    adaptive_increase_ratio: float
+    adaptive_success_threshold: Optional[int]
+    # key: method name to the per-minute limit learned in the adaptive mode
+    learned_max_requests_per_minute_for_each_api_method: Dict[str, float]
+    priority_min_shares: Dict[str, float]
+    priority_horizons: Dict[str, Optional[float]]
 
     def __init__(
         self,
@@ -38,51 +75,137 @@ class RateLimiter:
         enterprise_id: Optional[str] = None,
         number_of_nodes: int = 1,
         max_requests_per_minute_for_each_api_method: Optional[Dict[str, int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        backend: Optional[RateLimiterBackend] = None,
+        max_utilization: float = DEFAULT_MAX_UTILIZATION,
+        adaptive: bool = False,
+        adaptive_decrease_factor: float = DEFAULT_ADAPTIVE_DECREASE_FACTOR,
+        adaptive_increase_ratio: float = DEFAULT_ADAPTIVE_INCREASE_RATIO,
+        adaptive_success_threshold: Optional[int] = None,
+        priority_min_shares: Optional[Dict[str, float]] = None,
+        priority_horizons: Optional[Dict[str, Optional[float]]] = None,
     ):
+        """
+        Args:
+            enterprise_id: The enterprise org ID
+            number_of_nodes: The number of the nodes sharing the budget.
+                The local traffic is multiplied by this number to estimate the org-wide traffic.
+            max_requests_per_minute_for_each_api_method: The per-minute limits of API methods
+                that are different from MAX_REQUESTS_PER_MINUTE_FOR_API_METHOD
+            clock: A monotonic clock function, which can be replaced for testing
+            backend: The backend to reserve permits from (see rate_limit_backends).
+                With a backend shared by all the workers, they draw from one real org-wide budget.
+            max_utilization: The ratio of the budgets to use with a backend (0 < max_utilization <= 1)
+            adaptive: If True, a method's per-minute limit is multiplied by adaptive_decrease_factor
+                when a 429 error arrives, and then raised by adaptive_increase_ratio of the current limit
+                after every adaptive_success_threshold consecutive successful calls
+            adaptive_decrease_factor: The multiplicative decrease factor (0 < factor < 1)
+            adaptive_increase_ratio: The increase step relative to the current limit
+            adaptive_success_threshold: The number of consecutive successes before each increase
+                (default: the current per-minute limit, which means about a minute without errors)
+            priority_min_shares: key: priority to the share of the org-wide budget guaranteed to it
+                while it is waiting, so that it is never starved by higher priority traffic
+            priority_horizons: key: priority to how far ahead (in seconds) its permits can be reserved.
+                A shorter horizon leaves more permits to higher priority traffic.
+                The priorities take effect only with a backend; the traffic estimation ignores them.
+        """
+        if not 0 < max_utilization <= 1:
+            raise ValueError(
+                "max_utilization must be greater than 0 and less than or equal to 1"
+            )
+        self.priority_min_shares = dict(
+            priority_min_shares
+            if priority_min_shares is not None
+            else self.DEFAULT_PRIORITY_MIN_SHARES
+        )
+        if sum(self.priority_min_shares.values()) >= 1:
+            raise ValueError("The sum of priority_min_shares must be less than 1")
+        self.priority_horizons = dict(self.DEFAULT_PRIORITY_HORIZONS)
+        self.priority_horizons.update(priority_horizons or {})
         self.enterprise_id = enterprise_id
         self.number_of_nodes = number_of_nodes
-        self.org_call_histories_in_last_second = []
-        self.api_method_call_histories_in_last_minute = {}
+        # The timestamps in these deques are always in ascending order,
+        # so that expired ones can be evicted from the left side in amortized O(1)
+        self._org_call_histories_in_last_second: Deque[float] = deque()
+        self._api_method_call_histories_in_last_minute: Dict[str, Deque[float]] = {}
+        # A short window for detecting burst traffic toward a method
+        self._api_method_call_histories_in_last_three_seconds: Dict[
+            str, Deque[float]
+        ] = {}
         self.api_method_successful_call_counts = {}
         self.api_method_failed_call_counts = {}
-        self.max_requests_per_minute_for_each_api_method = (
+        # Copy the dict so that the class-level default is never shared
+        self.max_requests_per_minute_for_each_api_method = dict(
             max_requests_per_minute_for_each_api_method
             if max_requests_per_minute_for_each_api_method is not None
             else self.DEFAULT_MAX_REQUESTS_PER_MINUTE_FOR_EACH_API_METHOD
         )
+        self.clock = clock
         self.lock = Lock()
+        self.backend = backend
+        self.max_utilization = max_utilization
+        self.adaptive = adaptive
+        self.adaptive_decrease_factor = adaptive_decrease_factor
+        self.adaptive_increase_ratio = adaptive_increase_ratio
+        self.adaptive_success_threshold = adaptive_success_threshold
+        self.learned_max_requests_per_minute_for_each_api_method = {}
+        self._api_method_consecutive_success_counts: Dict[str, int] = {}
+        # key: method name to the time until which the method must not be called (Retry-After)
+        self._api_method_blocked_until: Dict[str, float] = {}
+        self._api_method_decrease_cooldown_until: Dict[str, float] = {}
+
+    @property
+    def org_call_histories_in_last_second(self) -> Deque[float]:
+        """The timestamps of the API calls in the last second"""
+        return self._org_call_histories_in_last_second
+
+    @org_call_histories_in_last_second.setter
+    def org_call_histories_in_last_second(self, histories: Iterable[float]):
+        self._org_call_histories_in_last_second = deque(sorted(histories))
+
+    @property
+    def api_method_call_histories_in_last_minute(self) -> Dict[str, Deque[float]]:
+        """key: method name (discovery.enterprise.info) to the timestamps of the calls in the last minute"""
+        return self._api_method_call_histories_in_last_minute
+
+    @api_method_call_histories_in_last_minute.setter
+    def api_method_call_histories_in_last_minute(
+        self, histories: Dict[str, Iterable[float]]
+    ):
+        self._api_method_call_histories_in_last_minute = {
+            k: deque(sorted(v)) for k, v in histories.items()
+        }
+        self._api_method_call_histories_in_last_three_seconds = {
+            k: deque(v)
+            for k, v in self._api_method_call_histories_in_last_minute.items()
+        }
 
     def cleanup(self):
         with self.lock:
-            org_call_histories = []
-            one_second_ago = time.time() - 1
-            for timestamp in self.org_call_histories_in_last_second:
-                if timestamp > one_second_ago:
-                    org_call_histories.append(timestamp)
-            self.org_call_histories_in_last_second = org_call_histories
-
-            one_minute_ago = time.time() - 60
-            for (
-                endpoint,
-                histories,
-            ) in self.api_method_call_histories_in_last_minute.items():
-                new_histories = []
-                for timestamp in histories:
-                    if timestamp > one_minute_ago:
-                        new_histories.append(timestamp)
-                self.api_method_call_histories_in_last_minute[endpoint] = new_histories
+            now = self.clock()
+            _evict(self._org_call_histories_in_last_second, now - 1)
+            one_minute_ago = now - 60
+            for histories in self._api_method_call_histories_in_last_minute.values():
+                _evict(histories, one_minute_ago)
+            three_seconds_ago = now - 3
+            for histories in (
+                self._api_method_call_histories_in_last_three_seconds.values()
+            ):
+                _evict(histories, three_seconds_ago, inclusive=False)
 
     def append_api_call_timestamp(self, api_method: str):
         with self.lock:
-            now = time.time()
-            self.org_call_histories_in_last_second.append(now)
-            api_method_histories = self.api_method_call_histories_in_last_minute.get(
-                api_method, []
-            )
-            api_method_histories.append(now)
-            self.api_method_call_histories_in_last_minute[
-                api_method
-            ] = api_method_histories
+            now = self.clock()
+            self._org_call_histories_in_last_second.append(now)
+            for histories_per_api_method in (
+                self._api_method_call_histories_in_last_minute,
+                self._api_method_call_histories_in_last_three_seconds,
+            ):
+                api_method_histories = histories_per_api_method.get(api_method)
+                if api_method_histories is None:
+                    api_method_histories = deque()
+                    histories_per_api_method[api_method] = api_method_histories
+                api_method_histories.append(now)
 
     def append_api_call_result(self, api_method: str, is_success: bool):
         with self.lock:
@@ -91,41 +214,156 @@ class RateLimiter:
                     self.api_method_successful_call_counts.get(api_method, 0) + 1
                 )
                 self.api_method_successful_call_counts[api_method] = new_count
+                if self.adaptive:
+                    self._increase_learned_limit(api_method)
             else:
                 new_count = self.api_method_failed_call_counts.get(api_method, 0) + 1
                 self.api_method_failed_call_counts[api_method] = new_count
 
+    def org_emission_interval(self) -> float:
+        """The minimum interval (in seconds) between two API calls on this node across the org"""
+        return self.number_of_nodes / (
+            self.MAX_REQUESTS_PER_SECOND_IN_ORG * self.max_utilization
+        )
+
+    def api_method_emission_interval(self, api_method: str) -> float:
+        """The minimum interval (in seconds) between two calls of the API method on this node"""
+        max_requests_for_api_method = self.get_max_requests_per_minute(api_method)
+        return (
+            60.0
+            * self.number_of_nodes
+            / (max_requests_for_api_method * self.max_utilization)
+        )
+
+    def api_method_burst_tolerance(self, api_method: str) -> float:
+        """How much earlier (in seconds) than its theoretical arrival time a call of the API method can be made.
+        The margin left by max_utilization is used for it as long as no one-minute window
+        exceeds the per-minute budget, so that calls can fill the gaps in the org-wide schedule.
+        """
+        max_requests_for_api_method = (
+            self.get_max_requests_per_minute(api_method) / self.number_of_nodes
+        )
+        emission_interval = self.api_method_emission_interval(api_method)
+        return max(0.0, (max_requests_for_api_method - 1) * emission_interval - 60)
+
+    def priority_emission_intervals(self, priority: str) -> Dict[str, float]:
+        """key: each priority lower than the given one to the minimum interval (in seconds)
+        between two API calls with higher priorities than it on this node, while it is waiting"""
+        intervals = {}
+        reserved_share = 0.0
+        for lower_priority in reversed(self.PRIORITIES):
+            if lower_priority == priority:
+                break
+            reserved_share += self.priority_min_shares.get(lower_priority, 0.0)
+            if reserved_share > 0:
+                intervals[lower_priority] = self.org_emission_interval() / (
+                    1 - reserved_share
+                )
+        return intervals
+
     def calculate_sleep_duration(self, api_method: str) -> float:
-        self.cleanup()
-        sleep_seconds = 0
+        """Returns the duration to sleep before calling the API method.
+        With a backend, a permit is reserved regardless of the priorities.
+        """
+        if self.backend is not None:
+            # Reserve the exact permit for this call
+            sleep_duration = self.backend.reserve(
+                api_method=api_method,
+                org_emission_interval=self.org_emission_interval(),
+                api_method_emission_interval=self.api_method_emission_interval(
+                    api_method
+                ),
+                api_method_burst_tolerance=self.api_method_burst_tolerance(api_method),
+            )
+        else:
+            sleep_duration = self._estimate_sleep_duration(api_method)
+        return self._respect_retry_after(api_method, sleep_duration)
 
-        # The estimated count of all the requests performed in the last second
-        last_second_org_call_count = (
-            len(self.org_call_histories_in_last_second) * self.number_of_nodes
+    def try_reserve(
+        self, api_method: str, priority: str = PRIORITY_DEFAULT
+    ) -> Tuple[float, bool]:
+        """Tries to reserve a permit for the API method with the given priority.
+        A permit is reserved only when it is within the priority's horizon.
+        If not, the caller is expected to wait for the returned duration and then try again,
+        as the permits further ahead are left to higher priority calls made in the meantime.
+        Without a backend, this method is the same as calculate_sleep_duration.
+        Args:
+            api_method: The API method name (e.g., discovery.users.list)
+            priority: One of PRIORITIES
+        Returns:
+            The duration (in seconds) to wait and whether a permit is reserved
+        """
+        if priority not in self.PRIORITIES:
+            raise ValueError(
+                f"Unknown priority: {priority} (must be one of {', '.join(self.PRIORITIES)})"
+            )
+        if self.backend is None:
+            return self.calculate_sleep_duration(api_method), True
+        sleep_duration, reserved = self.backend.try_reserve(
+            api_method=api_method,
+            org_emission_interval=self.org_emission_interval(),
+            api_method_emission_interval=self.api_method_emission_interval(api_method),
+            api_method_burst_tolerance=self.api_method_burst_tolerance(api_method),
+            priority_emission_intervals=self.priority_emission_intervals(priority),
+            priority_burst_tolerance=self.PRIORITY_BURST_TOLERANCE,
+            priority=priority,
+            horizon=self.priority_horizons.get(priority),
         )
+        if reserved:
+            sleep_duration = self._respect_retry_after(api_method, sleep_duration)
+        return sleep_duration, reserved
+
+    def _respect_retry_after(self, api_method: str, sleep_duration: float) -> float:
+        blocked_until = self._api_method_blocked_until.get(api_method)
+        if blocked_until is not None:
+            # Respect the Retry-After of the last 429 error
+            sleep_duration = max(sleep_duration, blocked_until - self.clock())
+        return sleep_duration
+
+    def _estimate_sleep_duration(self, api_method: str) -> float:
+        with self.lock:
+            now = self.clock()
+            _evict(self._org_call_histories_in_last_second, now - 1)
+            last_minute_histories = self._api_method_call_histories_in_last_minute.get(
+                api_method, _EMPTY_HISTORIES
+            )
+            _evict(last_minute_histories, now - 60)
+            last_three_seconds_histories = (
+                self._api_method_call_histories_in_last_three_seconds.get(
+                    api_method, _EMPTY_HISTORIES
+                )
+            )
+            # the burst window keeps timestamps newer than or equal to three seconds ago
+            _evict(last_three_seconds_histories, now - 3, inclusive=False)
+
+            # The estimated count of all the requests performed in the last second
+            last_second_org_call_count = (
+                len(self._org_call_histories_in_last_second) * self.number_of_nodes
+            )
+            # The estimated count of all the requests performed per endpoint in the last minute
+            last_minute_api_method_call_count = (
+                len(last_minute_histories) * self.number_of_nodes
+            )
+            # The estimated count of the requests performed per endpoint in the last three seconds
+            last_three_seconds_api_method_call_count = (
+                len(last_three_seconds_histories) * self.number_of_nodes
+            )
+
+        sleep_seconds = 0
 
         # Calculate the sleep_seconds considering the last second traffic
-        if last_second_org_call_count >= 10:
-            sleep_seconds = 0.02 + calculate_random_jitter(0.02)  # 1/20 - 1/30
-        elif last_second_org_call_count >= 20:
-            sleep_seconds = 0.05 + calculate_random_jitter(0.05)  # 1/10 - 1/20
+        # (the busiest condition has to be checked first)
+        if last_second_org_call_count >= 30:
+            sleep_seconds = 0.5 + calculate_random_jitter(0.5)
         elif last_second_org_call_count >= 25:
             sleep_seconds = 0.1 + calculate_random_jitter(0.1)  # 1/5 - 1/10
-        elif last_second_org_call_count >= 30:
-            sleep_seconds = 0.5 + calculate_random_jitter(0.5)
-
-        # The estimated count of all the requests performed per endpoint in the last minute
-        last_minutes_api_method_requests = (
-            self.api_method_call_histories_in_last_minute.get(api_method, [])
-        ) * self.number_of_nodes
-        last_minute_api_method_call_count = len(last_minutes_api_method_requests)
+        elif last_second_org_call_count >= 20:
+            sleep_seconds = 0.05 + calculate_random_jitter(0.05)  # 1/10 - 1/20
+        elif last_second_org_call_count >= 10:
+            sleep_seconds = 0.02 + calculate_random_jitter(0.02)  # 1/20 - 1/30
 
         # Calculate the sleep_seconds considering the last minute traffic toward the endpoint
-        max_requests_for_api_method = (
-            self.max_requests_per_minute_for_each_api_method.get(
-                api_method, self.MAX_REQUESTS_PER_MINUTE_FOR_API_METHOD
-            )
-        )
+        max_requests_for_api_method = self.get_max_requests_per_minute(api_method)
         denominator = max_requests_for_api_method / 15  # this value is usually 80
         if last_minute_api_method_call_count >= max_requests_for_api_method * 0.9:
             # Too fast paced:
@@ -142,37 +380,217 @@ class RateLimiter:
         if (
             max_requests_for_api_method >= 120
             and last_minute_api_method_call_count >= max_requests_for_api_method / 120
+            and last_three_seconds_api_method_call_count
+            >= max_requests_for_api_method / 120
         ):
             # Burst traffic:
             # Change the pace from 60 seconds to 180 seconds
-            three_seconds_ago = time.time() - 3
-            requests_in_last_three_seconds = [
-                timestamp
-                for timestamp in last_minutes_api_method_requests
-                if timestamp >= three_seconds_ago
-            ]
-            if len(requests_in_last_three_seconds) >= max_requests_for_api_method / 120:
-                sleep_seconds = 180 / denominator
+            sleep_seconds = 180 / denominator
 
         if sleep_seconds == 0:
             return 0
 
         return sleep_seconds + calculate_random_jitter(factor=0.05)
 
+    def get_max_requests_per_minute(self, api_method: str) -> float:
+        """The per-minute limit of the API method, which is the learned one in the adaptive mode"""
+        if self.adaptive:
+            learned = self.learned_max_requests_per_minute_for_each_api_method.get(
+                api_method
+            )
+            if learned is not None:
+                return learned
+        return self.max_requests_per_minute_for_each_api_method.get(
+            api_method, self.MAX_REQUESTS_PER_MINUTE_FOR_API_METHOD
+        )
+
+    def record_rate_limited(self, api_method: str, retry_after: Optional[float]):
+        """Records a 429 error for the API method.
+        The method is not called until Retry-After passes, and in the adaptive mode,
+        the method's per-minute limit is decreased.
+        Args:
+            api_method: The API method name (e.g., discovery.users.list)
+            retry_after: The value of the Retry-After response header (in seconds)
+        """
+        with self.lock:
+            now = self.clock()
+            if retry_after is not None and retry_after > 0:
+                self._api_method_blocked_until[api_method] = max(
+                    self._api_method_blocked_until.get(api_method, now),
+                    now + retry_after,
+                )
+            if self.adaptive:
+                self._api_method_consecutive_success_counts[api_method] = 0
+                # The concurrent calls sent before the first 429 error tend to fail together.
+                # Decrease the limit only once for them until the Retry-After passes.
+                if now < self._api_method_decrease_cooldown_until.get(api_method, now):
+                    return
+                self._api_method_decrease_cooldown_until[api_method] = now + max(
+                    1.0, retry_after or 0
+                )
+                self.learned_max_requests_per_minute_for_each_api_method[
+                    api_method
+                ] = max(
+                    self.MIN_LEARNED_REQUESTS_PER_MINUTE,
+                    self.get_max_requests_per_minute(api_method)
+                    * self.adaptive_decrease_factor,
+                )
+
+    def _increase_learned_limit(self, api_method: str):
+        # This method must be called while holding the lock
+        count = self._api_method_consecutive_success_counts.get(api_method, 0) + 1
+        threshold = (
+            self.adaptive_success_threshold
+            if self.adaptive_success_threshold is not None
+            else self.get_max_requests_per_minute(api_method)
+        )
+        if count < threshold:
+            self._api_method_consecutive_success_counts[api_method] = count
+            return
+        self._api_method_consecutive_success_counts[api_method] = 0
+        learned = self.get_max_requests_per_minute(api_method)
+        # Probe upward, but never beyond the max limit of any Discovery API method
+        self.learned_max_requests_per_minute_for_each_api_method[api_method] = min(
+            self.MAX_REQUESTS_PER_MINUTE_FOR_API_METHOD,
+            learned * (1 + self.adaptive_increase_ratio),
+        )
+
+    def save_learned_limits(self, file_path: str):
+        """Saves the per-minute limits learned in the adaptive mode as a JSON file."""
+        with self.lock:
+            data = {
+                "enterprise_id": self.enterprise_id,
+                "max_requests_per_minute_for_each_api_method": dict(
+                    self.learned_max_requests_per_minute_for_each_api_method
+                ),
+            }
+        # Write to a temporary file first so that a crash never leaves a broken file
+        temp_file_path = f"{file_path}.tmp"
+        with open(temp_file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temp_file_path, file_path)
+
+    def load_learned_limits(self, file_path: str):
+        """Loads the per-minute limits saved by save_learned_limits.
+        Nothing is loaded if the file does not exist or it was saved for a different org.
+        """
+        if not os.path.exists(file_path):
+            return
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("enterprise_id") != self.enterprise_id:
+            return
+        with self.lock:
+            for api_method, limit in data.get(
+                "max_requests_per_minute_for_each_api_method", {}
+            ).items():
+                self.learned_max_requests_per_minute_for_each_api_method[
+                    api_method
+                ] = float(limit)
+
     def generate_metrics_report(
         self,
     ) -> Dict[str, Optional[Union[str, int, Dict[str, int]]]]:
-        return {
-            "enterprise_id": self.enterprise_id,
-            "last_second_requests": len(self.org_call_histories_in_last_second),
-            "last_minute_requests_per_api_method": {
-                k: len(v)
-                for k, v in self.api_method_call_histories_in_last_minute.items()
-            },
-            "successful_call_counts": self.api_method_successful_call_counts,
-            "failed_call_counts": self.api_method_failed_call_counts,
-        }
+        with self.lock:
+            return {
+                "enterprise_id": self.enterprise_id,
+                "last_second_requests": len(self._org_call_histories_in_last_second),
+                "last_minute_requests_per_api_method": {
+                    k: len(v)
+                    for k, v in self._api_method_call_histories_in_last_minute.items()
+                },
+                "successful_call_counts": self.api_method_successful_call_counts,
+                "failed_call_counts": self.api_method_failed_call_counts,
+            }
+
+
+class GCRARateLimiter(RateLimiter):
+    """A RateLimiter that schedules every API call with the generic cell rate algorithm (GCRA).
+    Instead of guessing a sleep duration from the recent traffic, calculate_sleep_duration
+    reserves the next available permit for both the org-wide budget (30 requests per second)
+    and the API method's per-minute budget, and then returns the exact time until that permit.
+    As a permit is reserved when calculate_sleep_duration is called, the caller is expected
+    to perform the API call right after sleeping for the returned duration.
+    The traffic metrics (append_api_call_timestamp etc.) work in the same way as RateLimiter.
+
+    Example:
+    ```python
+    from slack_discovery_sdk import DiscoveryClient
+    from slack_discovery_sdk.rate_limit_support import GCRARateLimiter
+    client = DiscoveryClient(token=token, rate_limiter=GCRARateLimiter(enterprise_id="E111"))
+    ```
+    """
+
+    backend: RateLimiterBackend
+
+    def __init__(
+        self,
+        *,
+        enterprise_id: Optional[str] = None,
+        number_of_nodes: int = 1,
+        max_requests_per_minute_for_each_api_method: Optional[Dict[str, int]] = None,
+        max_utilization: float = RateLimiter.DEFAULT_MAX_UTILIZATION,
+        clock: Callable[[], float] = time.monotonic,
+        backend: Optional[RateLimiterBackend] = None,
+        adaptive: bool = False,
+        adaptive_decrease_factor: float = RateLimiter.DEFAULT_ADAPTIVE_DECREASE_FACTOR,
+        adaptive_increase_ratio: float = RateLimiter.DEFAULT_ADAPTIVE_INCREASE_RATIO,
+        adaptive_success_threshold: Optional[int] = None,
+        priority_min_shares: Optional[Dict[str, float]] = None,
+        priority_horizons: Optional[Dict[str, Optional[float]]] = None,
+    ):
+        """
+        Args:
+            enterprise_id: The enterprise org ID
+            number_of_nodes: The number of the nodes sharing the budget.
+                Each node is given the same share of the org-wide and per-method budgets.
+                Keep this 1 when the nodes share a backend.
+            max_requests_per_minute_for_each_api_method: The per-minute limits of API methods
+                that are different from MAX_REQUESTS_PER_MINUTE_FOR_API_METHOD
+            max_utilization: The ratio of the budgets to use (0 < max_utilization <= 1).
+                The default leaves a small margin for the clock skew between this process and Slack.
+            clock: A monotonic clock function, which can be replaced for testing
+            backend: The backend that keeps the permit schedule (default: in-memory)
+            adaptive: If True, the per-method limits are learned from 429 errors (see RateLimiter)
+            adaptive_decrease_factor: The multiplicative decrease factor in the adaptive mode
+            adaptive_increase_ratio: The increase step relative to the current limit
+            adaptive_success_threshold: The number of consecutive successes before each increase
+                (default: the current per-minute limit, which means about a minute without errors)
+            priority_min_shares: key: priority to the share of the org-wide budget guaranteed to it
+                while it is waiting (see RateLimiter)
+            priority_horizons: key: priority to how far ahead (in seconds) its permits can be reserved
+        """
+        super().__init__(
+            enterprise_id=enterprise_id,
+            number_of_nodes=number_of_nodes,
+            max_requests_per_minute_for_each_api_method=max_requests_per_minute_for_each_api_method,
+            max_utilization=max_utilization,
+            clock=clock,
+            backend=backend
+            if backend is not None
+            else InMemoryRateLimiterBackend(clock=clock),
+            adaptive=adaptive,
+            adaptive_decrease_factor=adaptive_decrease_factor,
+            adaptive_increase_ratio=adaptive_increase_ratio,
+            adaptive_success_threshold=adaptive_success_threshold,
+            priority_min_shares=priority_min_shares,
+            priority_horizons=priority_horizons,
+        )
 
 
 def calculate_random_jitter(factor: float = 1.0) -> float:
     return random.random() * factor
+
+
+_EMPTY_HISTORIES: Deque[float] = deque(maxlen=0)
+
+
+def _evict(histories: Deque[float], threshold: float, inclusive: bool = True):
+    """Removes the timestamps older than (or equal to, if inclusive) the threshold
+    from the left side of the sorted deque."""
+    if inclusive:
+        while histories and histories[0] <= threshold:
+            histories.popleft()
+    else:
+        while histories and histories[0] < threshold:
+            histories.popleft()
@@ -61,6 +61,7 @@ class DiscoveryResponse:
         body: dict,
         headers: dict,
         status_code: int,
+        priority: Optional[str] = None,
     ):
         self.http_method = http_method
         self.api_url = api_url
@@ -70,6 +71,8 @@ class DiscoveryResponse:
         self.body = body
         self.headers = headers
         self.status_code = status_code
+        # The following pages are fetched with the same priority
+        self.priority = priority
         self._initial_data = body
         self._iteration = None  # for __iter__ & __next__
         self._client = client
@@ -142,6 +145,7 @@ class DiscoveryResponse:
                 api_url=self.api_url,
                 headers=self.request_headers,
                 params=params,
+                priority=self.priority,
             )
             self.status_code = response["status_code"]
             self.headers = response["headers"]
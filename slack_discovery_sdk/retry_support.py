@@ -0,0 +1,388 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""Retry support for BaseDiscoveryClient and AsyncBaseDiscoveryClient.
+The clients retry a failed request in a loop (never recursively) as long as RetryEngine allows it.
+Each kind of failure is handled by its own RetryHandler:
+
+- RateLimitErrorRetryHandler: 429 Too Many Requests (waits for Retry-After)
+- ServerErrorRetryHandler: 500, 502, 503, 504
+- ConnectionErrorRetryHandler: connection resets etc.
+- TimeoutErrorRetryHandler: read/connect timeouts
+
+Example:
+```python
+from slack_discovery_sdk import DiscoveryClient
+from slack_discovery_sdk.retry_support import (
+    ConnectionErrorRetryHandler,
+    RateLimitErrorRetryHandler,
+    RetryEngine,
+    ServerErrorRetryHandler,
+)
+retry_engine = RetryEngine(
+    handlers=[
+        RateLimitErrorRetryHandler(max_retry_count=10),
+        ServerErrorRetryHandler(max_retry_count=3),
+        ConnectionErrorRetryHandler(max_retry_count=3),
+    ],
+    deadline=600,  # give up ten minutes after the first attempt
+    on_retry=[lambda event: print(event)],
+)
+client = DiscoveryClient(token=token, retry_engine=retry_engine)
+```
+"""
+
+import asyncio
+import random
+import socket
+import time
+from http.client import RemoteDisconnected
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence
+from urllib.error import URLError
+
+from .http_transport import HTTPTransportResponse  # type:ignore
+
+# The Discovery API methods that modify data.
+# Unless Slack surely rejected such a request without processing it (e.g., 429),
+# sending it again may apply the same change twice.
+DEFAULT_NON_IDEMPOTENT_API_METHODS = frozenset(
+    [
+        "discovery.chat.update",
+        "discovery.chat.delete",
+        "discovery.chat.tombstone",
+        "discovery.chat.restore",
+        "discovery.file.tombstone",
+        "discovery.file.restore",
+        "discovery.file.delete",
+        "discovery.files.release",
+    ]
+)
+
+
+class FullJitterBackoff:
+    """Exponential backoff with "full jitter".
+    The duration before the n-th retry is a random value between 0 and min(max_delay, base_delay * 2^(n-1)),
+    which spreads the retries from many workers instead of making them retry at the same time.
+    """
+
+    base_delay: float
+    max_delay: float
+
+    def __init__(self, *, base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Args:
+            base_delay: The upper bound (in seconds) of the duration before the first retry
+            max_delay: The upper bound (in seconds) of any duration
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def calculate(self, retry_count: int) -> float:
+        """
+        Args:
+            retry_count: The number of the retries done so far for the request
+        Returns:
+            The duration (in seconds) before the next retry
+        """
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * (2 ** retry_count))
+        )
+
+
+class RetryRequest:
+    def __init__(self, *, http_method: str, api_method: str, url: str):
+        self.http_method = http_method
+        self.api_method = api_method
+        self.url = url
+
+
+class RetryState:
+    """The retry state of a request, which is shared by all the handlers."""
+
+    def __init__(self, *, started_at: float):
+        self.started_at = started_at
+        # The number of the attempts (the first one and the retries) done so far
+        self.attempt_count = 1
+        # key: handler class name to the number of the retries it made
+        self.retry_counts: Dict[str, int] = {}
+
+
+class RetryEvent:
+    """Passed to the on_retry hooks right before the client sleeps and then retries a request."""
+
+    def __init__(
+        self,
+        *,
+        request: RetryRequest,
+        handler: "RetryHandler",
+        attempt: int,
+        sleep_duration: float,
+        response: Optional[HTTPTransportResponse],
+        error: Optional[Exception],
+    ):
+        self.request = request
+        self.handler = handler
+        # The number of the next attempt (2 for the first retry)
+        self.attempt = attempt
+        self.sleep_duration = sleep_duration
+        self.response = response
+        self.error = error
+
+    def __repr__(self):
+        reason = (
+            f"status: {self.response.status}"
+            if self.response is not None
+            else f"error: {self.error!r}"
+        )
+        return (
+            f"<RetryEvent api_method: {self.request.api_method}, attempt: {self.attempt}, "
+            f"sleep_duration: {round(self.sleep_duration, 3)}, {reason}>"
+        )
+
+
+class RetryHandler:
+    """Decides whether a kind of failure can be retried, and how long to wait before the retry."""
+
+    # True if the requests this handler retries were surely not processed by Slack,
+    # which means even non-idempotent API methods can be retried safely
+    safe_for_non_idempotent_api_methods: bool = False
+
+    max_retry_count: int
+    backoff: FullJitterBackoff
+
+    def __init__(
+        self,
+        *,
+        max_retry_count: int = 3,
+        backoff: Optional[FullJitterBackoff] = None,
+    ):
+        """
+        Args:
+            max_retry_count: The max number of the retries this handler makes for a request
+            backoff: The backoff before each retry
+        """
+        self.max_retry_count = max_retry_count
+        self.backoff = backoff if backoff is not None else FullJitterBackoff()
+
+    def can_retry(
+        self,
+        *,
+        response: Optional[HTTPTransportResponse],
+        error: Optional[Exception],
+    ) -> bool:
+        """Returns True if this handler is responsible for the failure."""
+        raise NotImplementedError()
+
+    def calculate_sleep_duration(
+        self,
+        *,
+        retry_count: int,
+        response: Optional[HTTPTransportResponse],
+    ) -> float:
+        return self.backoff.calculate(retry_count)
+
+
+class RateLimitErrorRetryHandler(RetryHandler):
+    """Retries 429 Too Many Requests after the duration in the Retry-After header (plus jitter)."""
+
+    safe_for_non_idempotent_api_methods = True
+
+    def __init__(
+        self,
+        *,
+        max_retry_count: int = 10,
+        backoff: Optional[FullJitterBackoff] = None,
+    ):
+        super().__init__(
+            max_retry_count=max_retry_count,
+            backoff=backoff
+            if backoff is not None
+            else FullJitterBackoff(base_delay=5.0, max_delay=5.0),
+        )
+
+    def can_retry(
+        self,
+        *,
+        response: Optional[HTTPTransportResponse],
+        error: Optional[Exception],
+    ) -> bool:
+        return response is not None and response.status == 429
+
+    def calculate_sleep_duration(
+        self,
+        *,
+        retry_count: int,
+        response: Optional[HTTPTransportResponse],
+    ) -> float:
+        jitter = self.backoff.calculate(retry_count)
+        retry_after = response.headers.get("Retry-After") if response else None
+        try:
+            return max(0.0, float(retry_after)) + jitter
+        except (TypeError, ValueError):
+            # No valid Retry-After header; fall back to the exponential backoff
+            return jitter
+
+
+class ServerErrorRetryHandler(RetryHandler):
+    """Retries the responses with 5xx status codes that are likely to be temporary."""
+
+    DEFAULT_STATUS_CODES = frozenset([500, 502, 503, 504])
+
+    status_codes: FrozenSet[int]
+
+    def __init__(
+        self,
+        *,
+        max_retry_count: int = 3,
+        backoff: Optional[FullJitterBackoff] = None,
+        status_codes: Optional[Iterable[int]] = None,
+    ):
+        super().__init__(max_retry_count=max_retry_count, backoff=backoff)
+        self.status_codes = (
+            frozenset(status_codes)
+            if status_codes is not None
+            else self.DEFAULT_STATUS_CODES
+        )
+
+    def can_retry(
+        self,
+        *,
+        response: Optional[HTTPTransportResponse],
+        error: Optional[Exception],
+    ) -> bool:
+        return response is not None and response.status in self.status_codes
+
+
+class ConnectionErrorRetryHandler(RetryHandler):
+    """Retries the requests that failed as the connection was reset or closed by the peer."""
+
+    ERROR_TYPES = (
+        ConnectionResetError,
+        ConnectionAbortedError,
+        BrokenPipeError,
+        RemoteDisconnected,
+        asyncio.IncompleteReadError,
+    )
+
+    def can_retry(
+        self,
+        *,
+        response: Optional[HTTPTransportResponse],
+        error: Optional[Exception],
+    ) -> bool:
+        return isinstance(_unwrap_error(error), self.ERROR_TYPES)
+
+
+class TimeoutErrorRetryHandler(RetryHandler):
+    """Retries the requests that timed out while connecting or waiting for the response."""
+
+    ERROR_TYPES = (socket.timeout, TimeoutError, asyncio.TimeoutError)
+
+    def can_retry(
+        self,
+        *,
+        response: Optional[HTTPTransportResponse],
+        error: Optional[Exception],
+    ) -> bool:
+        return isinstance(_unwrap_error(error), self.ERROR_TYPES)
+
+
+class RetryEngine:
+    """Decides whether a failed request is retried by consulting the handlers in order,
+    within the bounds of max_attempts and deadline."""
+
+    handlers: List[RetryHandler]
+    max_attempts: int
+    deadline: Optional[float]
+    on_retry: List[Callable[[RetryEvent], None]]
+    non_idempotent_api_methods: FrozenSet[str]
+    clock: Callable[[], float]
+
+    def __init__(
+        self,
+        *,
+        handlers: Optional[Sequence[RetryHandler]] = None,
+        max_attempts: int = 10,
+        deadline: Optional[float] = None,
+        on_retry: Optional[Sequence[Callable[[RetryEvent], None]]] = None,
+        non_idempotent_api_methods: Iterable[str] = DEFAULT_NON_IDEMPOTENT_API_METHODS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            handlers: The retry handlers (default: RateLimitErrorRetryHandler only)
+            max_attempts: The max number of the attempts for a request, including the first one
+            deadline: The total time budget (in seconds) for a request including all the retries.
+                A retry that would start after the deadline is not made.
+            on_retry: The hooks called with a RetryEvent right before each retry
+            non_idempotent_api_methods: The API methods that are retried only when
+                the failure surely means Slack did not process the request (e.g., 429)
+            clock: A monotonic clock function, which can be replaced for testing
+        """
+        self.handlers = (
+            list(handlers) if handlers is not None else [RateLimitErrorRetryHandler()]
+        )
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.on_retry = list(on_retry or [])
+        self.non_idempotent_api_methods = frozenset(non_idempotent_api_methods)
+        self.clock = clock
+
+    def start(self) -> RetryState:
+        """Creates the state for a new request."""
+        return RetryState(started_at=self.clock())
+
+    def next_retry(
+        self,
+        *,
+        state: RetryState,
+        request: RetryRequest,
+        response: Optional[HTTPTransportResponse] = None,
+        error: Optional[Exception] = None,
+    ) -> Optional[float]:
+        """Decides whether the failed attempt is retried. The state is updated when it is.
+        Returns:
+            The duration (in seconds) to sleep before the retry, or None if the client has to give up
+        """
+        if state.attempt_count >= self.max_attempts:
+            return None
+        for handler in self.handlers:
+            if not handler.can_retry(response=response, error=error):
+                continue
+            if (
+                request.api_method in self.non_idempotent_api_methods
+                and not handler.safe_for_non_idempotent_api_methods
+            ):
+                return None
+            handler_name = type(handler).__name__
+            retry_count = state.retry_counts.get(handler_name, 0)
+            if retry_count >= handler.max_retry_count:
+                return None
+            sleep_duration = handler.calculate_sleep_duration(
+                retry_count=retry_count, response=response
+            )
+            if (
+                self.deadline is not None
+                and self.clock() + sleep_duration > state.started_at + self.deadline
+            ):
+                return None
+            state.retry_counts[handler_name] = retry_count + 1
+            state.attempt_count += 1
+            event = RetryEvent(
+                request=request,
+                handler=handler,
+                attempt=state.attempt_count,
+                sleep_duration=sleep_duration,
+                response=response,
+                error=error,
+            )
+            for hook in self.on_retry:
+                hook(event)
+            return sleep_duration
+        return None
+
+
+def _unwrap_error(error: Optional[Exception]) -> Optional[BaseException]:
+    # urllib wraps socket errors with URLError
+    if isinstance(error, URLError) and isinstance(error.reason, BaseException):
+        return error.reason
+    return error
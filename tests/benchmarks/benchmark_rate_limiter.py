@@ -0,0 +1,47 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""Measures the per-call overhead of RateLimiter under concurrent access.
+
+Run this script as below:
+  python -m tests.benchmarks.benchmark_rate_limiter
+"""
+
+import time
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from slack_discovery_sdk.rate_limit_support import RateLimiter
+
+NUMBER_OF_THREADS = 100
+CALLS_PER_THREAD = 2_000
+API_METHODS = [
+    "discovery.conversations.history",
+    "discovery.conversations.info",
+    "discovery.users.list",
+]
+
+
+def run(rate_limiter: RateLimiter, index: int):
+    api_method = API_METHODS[index % len(API_METHODS)]
+    for _ in range(CALLS_PER_THREAD):
+        rate_limiter.calculate_sleep_duration(api_method)
+        rate_limiter.append_api_call_timestamp(api_method)
+        rate_limiter.append_api_call_result(api_method, is_success=True)
+
+
+def main():
+    rate_limiter = RateLimiter(enterprise_id="E111", number_of_nodes=1)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=NUMBER_OF_THREADS) as executor:
+        for i in range(NUMBER_OF_THREADS):
+            executor.submit(run, rate_limiter, i)
+    elapsed = time.perf_counter() - started
+    total_calls = NUMBER_OF_THREADS * CALLS_PER_THREAD
+    report = rate_limiter.generate_metrics_report()
+    print(f"threads: {NUMBER_OF_THREADS}, calls: {total_calls}")
+    print(f"elapsed: {elapsed:.2f} seconds")
+    print(f"overhead per call: {elapsed / total_calls * 1_000_000:.2f} microseconds")
+    print(f"entries in the last minute window: {report['last_minute_requests_per_api_method']}")
+
+
+if __name__ == "__main__":
+    main()
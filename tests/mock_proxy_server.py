@@ -0,0 +1,93 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""A minimal forward proxy server that supports CONNECT tunnels, for tests."""
+
+import select
+import socket
+import socketserver
+import threading
+from typing import List, Optional
+
+
+class MockProxyHandler(socketserver.BaseRequestHandler):
+    server: "MockProxyServer"
+
+    def handle(self):
+        head = b""
+        while b"\r\n\r\n" not in head:
+            data = self.request.recv(4096)
+            if not data:
+                return
+            head += data
+        head, _, rest = head.partition(b"\r\n\r\n")
+        lines = head.decode("iso-8859-1").split("\r\n")
+        method, target, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        with self.server.lock:
+            self.server.received_requests.append((method, target, headers))
+
+        if (
+            self.server.required_authorization is not None
+            and headers.get("proxy-authorization") != self.server.required_authorization
+        ):
+            self.request.sendall(
+                b"HTTP/1.1 407 Proxy Authentication Required\r\nContent-Length: 0\r\n\r\n"
+            )
+            return
+        if method != "CONNECT":
+            self.request.sendall(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\n\r\n")
+            return
+
+        host, _, port = target.rpartition(":")
+        upstream = socket.create_connection((host, int(port)))
+        with self.server.lock:
+            self.server.tunnel_count += 1
+        self.request.sendall(b"HTTP/1.1 200 Connection established\r\n\r\n")
+        if rest:
+            upstream.sendall(rest)
+        sockets = [self.request, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 5)
+                if not readable:
+                    return
+                for s in readable:
+                    data = s.recv(65536)
+                    if not data:
+                        return
+                    (upstream if s is self.request else self.request).sendall(data)
+        finally:
+            upstream.close()
+
+
+class MockProxyServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, required_authorization: Optional[str] = None):
+        super().__init__(("127.0.0.1", 0), MockProxyHandler)
+        self.lock = threading.Lock()
+        self.required_authorization = required_authorization
+        self.tunnel_count = 0
+        self.received_requests: List[tuple] = []
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "MockProxyServer":
+        self._thread = threading.Thread(
+            target=self.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
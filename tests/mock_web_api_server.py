@@ -0,0 +1,133 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""A local HTTP server that mimics the Slack Web API for tests that do not require real tokens."""
+
+import json
+import os
+import ssl
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+CERT_FILE = os.path.join(os.path.dirname(__file__), "certs", "localhost.crt")
+KEY_FILE = os.path.join(os.path.dirname(__file__), "certs", "localhost.key")
+
+
+def client_ssl_context() -> ssl.SSLContext:
+    """An SSLContext that trusts the self-signed certificate used by the mock server."""
+    return ssl.create_default_context(cafile=CERT_FILE)
+
+
+# (status code, response headers, response body)
+MockResponse = Tuple[int, Dict[str, str], bytes]
+MockRoute = Callable[[Dict[str, str]], MockResponse]
+
+
+def json_response(
+    body: dict, status: int = 200, headers: Optional[Dict[str, str]] = None
+) -> MockResponse:
+    all_headers = {"Content-Type": "application/json; charset=utf-8"}
+    all_headers.update(headers or {})
+    return status, all_headers, json.dumps(body).encode("utf-8")
+
+
+class MockRequest:
+    def __init__(
+        self,
+        *,
+        http_method: str,
+        api_method: str,
+        params: Dict[str, str],
+        headers: Dict[str, str],
+    ):
+        self.http_method = http_method
+        self.api_method = api_method
+        self.params = params
+        self.headers = headers
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockWebApiServer"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        parsed_url = urlparse(self.path)
+        params = dict(parse_qsl(parsed_url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > 0:
+            params.update(parse_qsl(self.rfile.read(length).decode("utf-8")))
+        api_method = parsed_url.path.split("/")[-1]
+        request = MockRequest(
+            http_method=self.command,
+            api_method=api_method,
+            params=params,
+            headers=dict(self.headers.items()),
+        )
+        with self.server.lock:
+            self.server.received_requests.append(request)
+        route = self.server.routes.get(api_method)
+        if route is None:
+            status, headers, body = json_response(
+                {"ok": False, "error": "unknown_method"}
+            )
+        else:
+            status, headers, body = route(params)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.drop_connections_silently:
+            # Close the socket without "Connection: close" so that the client keeps a stale connection
+            self.close_connection = True
+
+
+class MockWebApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, tls: bool = False):
+        super().__init__(("127.0.0.1", 0), MockHandler)
+        self.tls = tls
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(CERT_FILE, KEY_FILE)
+            self.socket = context.wrap_socket(self.socket, server_side=True)
+        self.lock = threading.Lock()
+        self.connection_count = 0
+        self.drop_connections_silently = False
+        self.received_requests: List[MockRequest] = []
+        self.routes: Dict[str, MockRoute] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://127.0.0.1:{self.server_address[1]}/api/"
+
+    def start(self) -> "MockWebApiServer":
+        self._thread = threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
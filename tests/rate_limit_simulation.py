@@ -0,0 +1,150 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+"""A discrete-event simulator that drives a rate limiter with a simulated clock.
+Each simulated worker repeatedly calls an API method in the same way as BaseDiscoveryClient does:
+calculate_sleep_duration -> sleep -> append_api_call_timestamp -> (the request takes some time) -> ..."""
+
+import heapq
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from slack_discovery_sdk.rate_limit_support import RateLimiter
+
+
+class SimulatedClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# (the time the API call was performed, API method)
+SimulatedCall = Tuple[float, str]
+
+_ASK = 0
+_FIRE = 1
+
+
+class SimulatedSlack:
+    """Enforces the rate limits with sliding windows, in the same way as the Slack API server does."""
+
+    def __init__(
+        self,
+        *,
+        max_requests_per_second: int = 30,
+        max_requests_per_minute_for_each_api_method: Optional[Dict[str, int]] = None,
+        max_requests_per_minute: int = 1200,
+    ):
+        self.max_requests_per_second = max_requests_per_second
+        self.max_requests_per_minute_for_each_api_method = (
+            max_requests_per_minute_for_each_api_method or {}
+        )
+        self.max_requests_per_minute = max_requests_per_minute
+        self.rate_limited_calls: List[SimulatedCall] = []
+        self._org_calls: Deque[float] = deque()
+        self._api_method_calls: Dict[str, Deque[float]] = {}
+
+    def handle(self, now: float, api_method: str) -> Optional[int]:
+        """Returns None if the call is accepted. Otherwise, returns the Retry-After value."""
+        org_calls = self._org_calls
+        while org_calls and org_calls[0] <= now - 1:
+            org_calls.popleft()
+        api_method_calls = self._api_method_calls.setdefault(api_method, deque())
+        while api_method_calls and api_method_calls[0] <= now - 60:
+            api_method_calls.popleft()
+        limit = self.max_requests_per_minute_for_each_api_method.get(
+            api_method, self.max_requests_per_minute
+        )
+        if len(org_calls) >= self.max_requests_per_second:
+            retry_after = 1
+        elif len(api_method_calls) >= limit:
+            retry_after = max(1, math.ceil(api_method_calls[0] + 60 - now))
+        else:
+            org_calls.append(now)
+            api_method_calls.append(now)
+            return None
+        self.rate_limited_calls.append((now, api_method))
+        return retry_after
+
+
+def simulate(
+    *,
+    rate_limiter: RateLimiter,
+    clock: SimulatedClock,
+    workers: Sequence[str],
+    duration: float,
+    latency: float = 0.05,
+    server: Optional[SimulatedSlack] = None,
+    priorities: Optional[Sequence[str]] = None,
+    waits: Optional[Dict[str, List[float]]] = None,
+) -> List[SimulatedCall]:
+    """Runs the workers (each of them is given an API method to call) for the duration.
+    If a server is given, rate limited errors are reported to the rate limiter.
+    If priorities are given (one for each worker), the workers call try_reserve until a permit is reserved,
+    and the durations each call waited for are appended to waits (key: priority).
+    Returns:
+        The successful API calls performed in the simulation, in ascending order of time
+    """
+    start = clock.now
+    end = start + duration
+    events = [(start, _ASK, i) for i in range(len(workers))]
+    heapq.heapify(events)
+    asked_at = {i: start for i in range(len(workers))}
+    calls: List[SimulatedCall] = []
+    while events:
+        time, kind, worker = heapq.heappop(events)
+        clock.now = time
+        api_method = workers[worker]
+        if kind == _ASK:
+            if priorities is None:
+                sleep_duration = rate_limiter.calculate_sleep_duration(api_method)
+                reserved = True
+            else:
+                sleep_duration, reserved = rate_limiter.try_reserve(
+                    api_method, priorities[worker]
+                )
+            heapq.heappush(
+                events, (time + sleep_duration, _FIRE if reserved else _ASK, worker)
+            )
+        else:
+            if time >= end:
+                continue
+            if waits is not None and priorities is not None:
+                waits.setdefault(priorities[worker], []).append(
+                    time - asked_at[worker]
+                )
+            rate_limiter.append_api_call_timestamp(api_method)
+            retry_after = server.handle(time, api_method) if server else None
+            if retry_after is None:
+                rate_limiter.append_api_call_result(api_method, is_success=True)
+                calls.append((time, api_method))
+            else:
+                rate_limiter.append_api_call_result(api_method, is_success=False)
+                rate_limiter.record_rate_limited(api_method, retry_after)
+            asked_at[worker] = time + latency
+            heapq.heappush(events, (time + latency, _ASK, worker))
+    return calls
+
+
+def max_calls_in_window(calls: Sequence[SimulatedCall], window: float) -> int:
+    """The max number of calls in any sliding window of the given length (in seconds)."""
+    times = sorted(t for t, _ in calls)
+    max_count = 0
+    left = 0
+    for right, t in enumerate(times):
+        # The window (t - window, t]
+        while times[left] <= t - window:
+            left += 1
+        max_count = max(max_count, right - left + 1)
+    return max_count
+
+
+def calls_per_api_method(
+    calls: Sequence[SimulatedCall],
+) -> Dict[str, List[SimulatedCall]]:
+    result: Dict[str, List[SimulatedCall]] = {}
+    for call in calls:
+        result.setdefault(call[1], []).append(call)
+    return result
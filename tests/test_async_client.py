@@ -0,0 +1,74 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+import asyncio
+
+from slack_discovery_sdk import AsyncDiscoveryClient, DiscoveryClient
+from slack_discovery_sdk.async_response import AsyncDiscoveryResponse
+from tests.mock_web_api_server import MockWebApiServer, json_response
+
+
+def users_list(params: dict):
+    offset = int(params.get("offset") or 0)
+    users = [{"id": f"U{offset + i}"} for i in range(2)]
+    body = {"ok": True, "users": users}
+    if offset < 4:
+        body["offset"] = str(offset + 2)
+    return json_response(body)
+
+
+class TestAsyncClient:
+    def setup_method(self):
+        self.server = MockWebApiServer().start()
+        self.server.routes["discovery.users.list"] = users_list
+        self.server.routes["discovery.enterprise.info"] = lambda params: json_response(
+            {"ok": True, "enterprise": {"id": "E111"}}
+        )
+
+    def teardown_method(self):
+        self.server.stop()
+
+    def test_method_parity(self):
+        sync_methods = {m for m in dir(DiscoveryClient) if m.startswith("discovery_")}
+        async_methods = {
+            m for m in dir(AsyncDiscoveryClient) if m.startswith("discovery_")
+        }
+        assert sync_methods == async_methods
+        for name in async_methods:
+            assert asyncio.iscoroutinefunction(getattr(AsyncDiscoveryClient, name))
+
+    def test_pagination(self):
+        async def run():
+            client = AsyncDiscoveryClient(
+                token="xoxp-111",
+                base_url=self.server.base_url,
+                rate_limit_error_prevention_enabled=False,
+            )
+            user_ids = []
+            response = await client.discovery_users_list(limit=2)
+            assert isinstance(response, AsyncDiscoveryResponse)
+            async for page in response:
+                user_ids += [u["id"] for u in page["users"]]
+            await client.close()
+            return user_ids
+
+        assert asyncio.run(run()) == ["U0", "U1", "U2", "U3", "U4", "U5"]
+        # The keep-alive connection is reused for all the pages
+        assert self.server.connection_count == 1
+        assert self.server.received_requests[2].params["offset"] == "4"
+
+    def test_concurrency(self):
+        async def run():
+            client = AsyncDiscoveryClient(
+                token="xoxp-111", base_url=self.server.base_url
+            )
+            responses = await asyncio.gather(
+                *[client.discovery_enterprise_info() for _ in range(50)]
+            )
+            await client.close()
+            return responses, client.transport
+
+        responses, transport = asyncio.run(run())
+        assert all(r["enterprise"]["id"] == "E111" for r in responses)
+        total = transport.created_connection_count + transport.reused_connection_count
+        assert total == 50
+        assert len(self.server.received_requests) == 50
@@ -0,0 +1,68 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+from concurrent.futures.thread import ThreadPoolExecutor
+
+from slack_discovery_sdk import DiscoveryClient
+from slack_discovery_sdk.http_transport import PooledHTTPTransport
+from tests.mock_web_api_server import MockWebApiServer, json_response
+
+
+class TestHTTPTransport:
+    def setup_method(self):
+        self.server = MockWebApiServer().start()
+        self.server.routes["discovery.enterprise.info"] = lambda params: json_response(
+            {"ok": True, "enterprise": {"id": "E111"}}
+        )
+
+    def teardown_method(self):
+        self.server.stop()
+
+    def build_client(self, transport: PooledHTTPTransport) -> DiscoveryClient:
+        return DiscoveryClient(
+            token="xoxp-111",
+            base_url=self.server.base_url,
+            rate_limit_error_prevention_enabled=False,
+            transport=transport,
+        )
+
+    def test_keep_alive(self):
+        transport = PooledHTTPTransport()
+        client = self.build_client(transport)
+        for _ in range(10):
+            response = client.discovery_enterprise_info()
+            assert response["enterprise"]["id"] == "E111"
+        assert self.server.connection_count == 1
+        assert transport.created_connection_count == 1
+        assert transport.reused_connection_count == 9
+
+    def test_shared_across_threads(self):
+        transport = PooledHTTPTransport(pool_size=4)
+        client = self.build_client(transport)
+        executor = ThreadPoolExecutor(max_workers=4)
+        try:
+            futures = [
+                executor.submit(client.discovery_enterprise_info) for _ in range(100)
+            ]
+            for f in futures:
+                assert f.result().status_code == 200
+        finally:
+            executor.shutdown()
+        assert len(self.server.received_requests) == 100
+        assert self.server.connection_count <= 4 * 2
+
+    def test_idle_timeout(self):
+        transport = PooledHTTPTransport(idle_timeout=0)
+        client = self.build_client(transport)
+        for _ in range(3):
+            client.discovery_enterprise_info()
+        assert transport.reused_connection_count == 0
+        assert self.server.connection_count == 3
+
+    def test_stale_connection_retry(self):
+        self.server.drop_connections_silently = True
+        transport = PooledHTTPTransport()
+        client = self.build_client(transport)
+        for _ in range(3):
+            response = client.discovery_enterprise_info()
+            assert response["enterprise"]["id"] == "E111"
+        assert self.server.connection_count == 3
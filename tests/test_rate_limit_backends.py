@@ -0,0 +1,105 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+import multiprocessing
+import os
+import tempfile
+import time
+from typing import List, Tuple
+
+from slack_discovery_sdk.rate_limit_backends import (
+    FileLockRateLimiterBackend,
+    PermitSchedule,
+    RateLimitCoordinator,
+    SocketRateLimiterBackend,
+)
+from slack_discovery_sdk.rate_limit_support import RateLimiter
+from tests.rate_limit_simulation import (
+    calls_per_api_method,
+    max_calls_in_window,
+)
+
+API_METHODS = [
+    "discovery.enterprise.info",
+    "discovery.users.list",
+    "discovery.conversations.history",
+]
+
+
+def _reserve_permits(args: Tuple[str, dict, int, int]) -> List[Tuple[float, str]]:
+    """Runs in a worker process. Returns the reserved permits in the wall clock time."""
+    backend_type, backend_args, worker_index, count = args
+    if backend_type == "file":
+        backend = FileLockRateLimiterBackend(**backend_args)
+    else:
+        backend = SocketRateLimiterBackend(**backend_args)
+    rate_limiter = RateLimiter(backend=backend)
+    permits = []
+    for i in range(count):
+        # The workers are uneven; some call the APIs more often than others
+        api_method = API_METHODS[(worker_index + i) % len(API_METHODS)]
+        sleep_duration = rate_limiter.calculate_sleep_duration(api_method)
+        permits.append((time.time() + sleep_duration, api_method))
+    backend.close()
+    return permits
+
+
+def _run_workers(backend_type: str, backend_args: dict) -> List[Tuple[float, str]]:
+    jobs = [
+        (backend_type, backend_args, worker_index, count)
+        for worker_index, count in enumerate([10, 20, 40, 80])
+    ]
+    with multiprocessing.Pool(len(jobs)) as pool:
+        results = pool.map(_reserve_permits, jobs)
+    return sorted(permit for permits in results for permit in permits)
+
+
+class TestRateLimitBackends:
+    def test_permit_schedule_serialization(self):
+        schedule = PermitSchedule()
+        assert schedule.reserve(
+            now=100.0,
+            api_method="discovery.conversations.search",
+            org_emission_interval=0.1,
+            api_method_emission_interval=10.0,
+        ) == 0
+        restored = PermitSchedule.from_dict(schedule.to_dict())
+        assert restored.reserve(
+            now=100.0,
+            api_method="discovery.conversations.search",
+            org_emission_interval=0.1,
+            api_method_emission_interval=10.0,
+        ) == 10
+
+    def test_file_lock_backend_across_processes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "rate_limiter.json")
+            permits = _run_workers("file", {"path": path})
+        assert len(permits) == 150
+        # All the processes draw from a single org-wide budget
+        # (the window is slightly shortened as the permits are measured after each reservation)
+        assert max_calls_in_window(permits, 0.95) <= 30
+        for method_permits in calls_per_api_method(permits).values():
+            assert max_calls_in_window(method_permits, 60) <= 1200
+        # ... without wasting it
+        assert permits[-1][0] - permits[0][0] < 150 / 30 / 0.9
+
+    def test_broken_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "rate_limiter.json")
+            with open(path, "w") as f:
+                f.write("{")
+            rate_limiter = RateLimiter(backend=FileLockRateLimiterBackend(path=path))
+            assert rate_limiter.calculate_sleep_duration(API_METHODS[0]) == 0
+
+    def test_socket_backend_across_processes(self):
+        coordinator = RateLimitCoordinator().start()
+        try:
+            host, port = coordinator.address
+            permits = _run_workers("socket", {"host": host, "port": port})
+        finally:
+            coordinator.stop()
+        assert len(permits) == 150
+        assert max_calls_in_window(permits, 0.95) <= 30
+        for method_permits in calls_per_api_method(permits).values():
+            assert max_calls_in_window(method_permits, 60) <= 1200
+        assert permits[-1][0] - permits[0][0] < 150 / 30 / 0.9
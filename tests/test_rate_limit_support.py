@@ -1,8 +1,21 @@
 # Copyright 2021, Slack Technologies, LLC. All rights reserved.
 
-import time
+import os
+import tempfile
 
-from slack_discovery_sdk.rate_limit_support import RateLimiter
+import pytest
+
+from slack_discovery_sdk import DiscoveryClient
+from slack_discovery_sdk.errors import DiscoveryApiError
+from slack_discovery_sdk.rate_limit_support import GCRARateLimiter, RateLimiter
+from tests.mock_web_api_server import MockWebApiServer, json_response
+from tests.rate_limit_simulation import (
+    SimulatedClock,
+    SimulatedSlack,
+    calls_per_api_method,
+    max_calls_in_window,
+    simulate,
+)
 
 
 class TestRateLimitSupport:
@@ -15,7 +28,7 @@ class TestRateLimitSupport:
             RateLimiter(enterprise_id="E111", number_of_nodes=10),
         ]
         for rate_limiter in rate_limiters:
-            now = time.time()
+            now = rate_limiter.clock()
             rate_limiter.org_call_histories_in_last_second = [
                 now,
                 now - 0.01,
@@ -43,3 +56,240 @@ class TestRateLimitSupport:
                 )
                 == 3
             )
+
+    def test_sliding_window(self):
+        current_time = [1000.0]
+        rate_limiter = RateLimiter(
+            enterprise_id="E111", clock=lambda: current_time[0]
+        )
+        for _ in range(9):
+            rate_limiter.append_api_call_timestamp("discovery.enterprise.info")
+            current_time[0] += 0.01
+        assert rate_limiter.calculate_sleep_duration("discovery.enterprise.info") == 0
+
+        rate_limiter.append_api_call_timestamp("discovery.enterprise.info")
+        assert rate_limiter.calculate_sleep_duration("discovery.enterprise.info") > 0
+
+        # After three seconds, both the org-wide window and the burst window are empty
+        current_time[0] += 3
+        assert rate_limiter.calculate_sleep_duration("discovery.enterprise.info") == 0
+        report = rate_limiter.generate_metrics_report()
+        assert report["last_second_requests"] == 0
+        assert report["last_minute_requests_per_api_method"] == {
+            "discovery.enterprise.info": 10
+        }
+
+        current_time[0] += 60
+        rate_limiter.cleanup()
+        report = rate_limiter.generate_metrics_report()
+        assert report["last_minute_requests_per_api_method"] == {
+            "discovery.enterprise.info": 0
+        }
+
+    def test_per_method_limit(self):
+        current_time = [1000.0]
+        rate_limiter = RateLimiter(clock=lambda: current_time[0])
+        api_method = "discovery.conversations.search"
+        rate_limiter.append_api_call_timestamp(api_method)
+        current_time[0] += 5
+        rate_limiter.append_api_call_timestamp(api_method)
+        # 2 out of 6 requests per minute is "somewhat busy"
+        assert rate_limiter.calculate_sleep_duration(api_method) >= 30 / (6 / 15)
+
+    def test_busy_org_traffic(self):
+        current_time = [1000.0]
+        rate_limiter = RateLimiter(clock=lambda: current_time[0])
+        for _ in range(30):
+            rate_limiter.append_api_call_timestamp("discovery.enterprise.info")
+        # The longest sleep has to be chosen when the org-wide budget is used up
+        assert rate_limiter.calculate_sleep_duration("discovery.users.list") >= 0.5
+
+    def test_gcra_org_throughput(self):
+        clock = SimulatedClock()
+        rate_limiter = GCRARateLimiter(enterprise_id="E111", clock=clock)
+        workers = [
+            "discovery.enterprise.info",
+            "discovery.users.list",
+            "discovery.conversations.history",
+        ] * 20
+        calls = simulate(
+            rate_limiter=rate_limiter, clock=clock, workers=workers, duration=120
+        )
+        assert max_calls_in_window(calls, 1) <= 30
+        for method_calls in calls_per_api_method(calls).values():
+            assert max_calls_in_window(method_calls, 60) <= 1200
+        # Sustained throughput close to the limit
+        assert len(calls) >= 30 * 120 * 0.9
+
+    def test_gcra_search_budget(self):
+        clock = SimulatedClock()
+        rate_limiter = GCRARateLimiter(enterprise_id="E111", clock=clock)
+        workers = (
+            ["discovery.conversations.search"] * 5
+            + ["discovery.users.list"] * 25
+            + ["discovery.enterprise.info"] * 25
+        )
+        calls = simulate(
+            rate_limiter=rate_limiter, clock=clock, workers=workers, duration=300
+        )
+        assert max_calls_in_window(calls, 1) <= 30
+        search_calls = calls_per_api_method(calls)["discovery.conversations.search"]
+        assert max_calls_in_window(search_calls, 60) <= 6
+        assert len(search_calls) >= 6 * 5 * 0.9
+        # The reserved search permits do not block the other methods
+        assert len(calls) >= 30 * 300 * 0.9
+
+    def test_gcra_multiple_nodes(self):
+        clock = SimulatedClock()
+        rate_limiter = GCRARateLimiter(number_of_nodes=3, clock=clock)
+        calls = simulate(
+            rate_limiter=rate_limiter,
+            clock=clock,
+            workers=["discovery.enterprise.info", "discovery.users.list"] * 15,
+            duration=60,
+        )
+        # Each node uses its share of the org-wide budget
+        assert max_calls_in_window(calls, 1) <= 10
+        assert len(calls) >= 10 * 60 * 0.9
+
+    def test_gcra_exact_wait_time(self):
+        clock = SimulatedClock()
+        rate_limiter = GCRARateLimiter(max_utilization=1.0, clock=clock)
+        api_method = "discovery.conversations.search"
+        assert rate_limiter.calculate_sleep_duration(api_method) == 0
+        assert rate_limiter.calculate_sleep_duration(api_method) == 10
+        # The permit reserved for the search API does not delay the other methods
+        sleep_duration = rate_limiter.calculate_sleep_duration("discovery.users.list")
+        assert sleep_duration == pytest.approx(1 / 30)
+
+    def test_gcra_rate_limiter_option(self):
+        server = MockWebApiServer().start()
+        try:
+            server.routes["discovery.enterprise.info"] = lambda params: json_response(
+                {"ok": True, "enterprise": {"id": "E111"}}
+            )
+            rate_limiter = GCRARateLimiter(enterprise_id="E111")
+            client = DiscoveryClient(
+                token="xoxp-valid",
+                base_url=server.base_url,
+                rate_limiter=rate_limiter,
+            )
+            for _ in range(3):
+                assert client.discovery_enterprise_info()["ok"] is True
+            report = rate_limiter.generate_metrics_report()
+            assert report["last_minute_requests_per_api_method"] == {
+                "discovery.enterprise.info": 3
+            }
+        finally:
+            server.stop()
+
+    def test_default_limits_not_shared(self):
+        rate_limiter = RateLimiter()
+        limits = rate_limiter.max_requests_per_minute_for_each_api_method
+        limits["discovery.users.list"] = 10
+        assert (
+            "discovery.users.list"
+            not in RateLimiter.DEFAULT_MAX_REQUESTS_PER_MINUTE_FOR_EACH_API_METHOD
+        )
+
+    def test_adaptive_feedback(self):
+        clock = SimulatedClock()
+        rate_limiter = GCRARateLimiter(
+            adaptive=True, adaptive_success_threshold=5, clock=clock
+        )
+        api_method = "discovery.users.list"
+        rate_limiter.record_rate_limited(api_method, retry_after=3)
+        assert rate_limiter.get_max_requests_per_minute(api_method) == 1200 * 0.7
+        assert rate_limiter.calculate_sleep_duration(api_method) == pytest.approx(3)
+        # The concurrent calls failing together decrease the limit only once
+        rate_limiter.record_rate_limited(api_method, retry_after=3)
+        assert rate_limiter.get_max_requests_per_minute(api_method) == 1200 * 0.7
+
+        clock.now += 3
+        for _ in range(5):
+            rate_limiter.append_api_call_result(api_method, is_success=True)
+        assert rate_limiter.get_max_requests_per_minute(api_method) == pytest.approx(
+            1200 * 0.7 * 1.05
+        )
+        # Other methods are not affected
+        other_api_method = "discovery.enterprise.info"
+        assert rate_limiter.get_max_requests_per_minute(other_api_method) == 1200
+
+    def test_non_adaptive_retry_after(self):
+        clock = SimulatedClock()
+        rate_limiter = RateLimiter(clock=clock)
+        api_method = "discovery.users.list"
+        rate_limiter.record_rate_limited(api_method, retry_after=10)
+        assert rate_limiter.calculate_sleep_duration(api_method) == 10
+        assert rate_limiter.get_max_requests_per_minute(api_method) == 1200
+        clock.now += 10
+        assert rate_limiter.calculate_sleep_duration(api_method) == 0
+
+    def test_adaptive_convergence(self):
+        clock = SimulatedClock()
+        rate_limiter = GCRARateLimiter(adaptive=True, clock=clock)
+        # The limit actually enforced for this org is unknown to the rate limiter
+        server = SimulatedSlack(
+            max_requests_per_minute_for_each_api_method={"discovery.users.list": 300}
+        )
+        calls = simulate(
+            rate_limiter=rate_limiter,
+            clock=clock,
+            workers=["discovery.users.list"] * 20,
+            duration=1200,
+            server=server,
+        )
+        converged_since = clock.now - 600
+        converged_calls = [c for c in calls if c[0] >= converged_since]
+        converged_errors = [
+            c for c in server.rate_limited_calls if c[0] >= converged_since
+        ]
+        assert len(converged_calls) >= 300 * 10 * 0.75
+        assert len(converged_errors) <= 10
+
+    def test_save_and_load_learned_limits(self):
+        rate_limiter = RateLimiter(enterprise_id="E111", adaptive=True)
+        rate_limiter.record_rate_limited("discovery.users.list", retry_after=None)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            file_path = os.path.join(tmpdir, "learned_limits.json")
+            rate_limiter.save_learned_limits(file_path)
+
+            restored = RateLimiter(enterprise_id="E111", adaptive=True)
+            restored.load_learned_limits(file_path)
+            assert restored.get_max_requests_per_minute(
+                "discovery.users.list"
+            ) == pytest.approx(1200 * 0.7)
+
+            # The limits learned for a different org are ignored
+            another_org = RateLimiter(enterprise_id="E222", adaptive=True)
+            another_org.load_learned_limits(file_path)
+            assert (
+                another_org.get_max_requests_per_minute("discovery.users.list") == 1200
+            )
+
+            # Nothing happens if the file does not exist yet
+            restored.load_learned_limits(os.path.join(tmpdir, "unknown.json"))
+
+    def test_client_reports_rate_limited_errors(self):
+        server = MockWebApiServer().start()
+        try:
+            server.routes["discovery.users.list"] = lambda params: json_response(
+                {"ok": False, "error": "ratelimited"},
+                status=429,
+                headers={"Retry-After": "30"},
+            )
+            rate_limiter = RateLimiter(adaptive=True)
+            client = DiscoveryClient(
+                token="xoxp-valid",
+                base_url=server.base_url,
+                rate_limiter=rate_limiter,
+                rate_limit_error_prevention_enabled=False,
+            )
+            with pytest.raises(DiscoveryApiError):
+                client.discovery_users_list()
+            assert rate_limiter.get_max_requests_per_minute(
+                "discovery.users.list"
+            ) == pytest.approx(1200 * 0.7)
+            assert rate_limiter.calculate_sleep_duration("discovery.users.list") > 29
+        finally:
+            server.stop()
@@ -0,0 +1,246 @@
+# Copyright 2021, Slack Technologies, LLC. All rights reserved.
+
+import asyncio
+import socket
+from email.message import Message
+from typing import List, Optional
+from urllib.error import URLError
+
+import pytest
+
+from slack_discovery_sdk import AsyncDiscoveryClient, DiscoveryClient
+from slack_discovery_sdk.errors import DiscoveryApiError
+from slack_discovery_sdk.http_transport import HTTPTransportResponse
+from slack_discovery_sdk.retry_support import (
+    ConnectionErrorRetryHandler,
+    FullJitterBackoff,
+    RateLimitErrorRetryHandler,
+    RetryEngine,
+    RetryEvent,
+    RetryRequest,
+    RetryState,
+    ServerErrorRetryHandler,
+    TimeoutErrorRetryHandler,
+)
+from tests.mock_web_api_server import MockWebApiServer, json_response
+from tests.rate_limit_simulation import SimulatedClock
+
+NO_BACKOFF = FullJitterBackoff(base_delay=0, max_delay=0)
+TOMBSTONE = "discovery.chat.tombstone"
+
+
+def response(status: int, retry_after: str = None) -> HTTPTransportResponse:
+    headers = Message()
+    if retry_after is not None:
+        headers["Retry-After"] = retry_after
+    return HTTPTransportResponse(status=status, headers=headers, body=b"")
+
+
+def request(api_method: str = "discovery.users.list") -> RetryRequest:
+    return RetryRequest(
+        http_method="POST",
+        api_method=api_method,
+        url=f"https://slack.com/api/{api_method}",
+    )
+
+
+def next_retry(
+    engine: RetryEngine,
+    state: RetryState = None,
+    api_method: str = "discovery.users.list",
+    **kwargs,
+) -> Optional[float]:
+    return engine.next_retry(
+        state=state if state is not None else engine.start(),
+        request=request(api_method),
+        **kwargs,
+    )
+
+
+def failing_route(statuses: List[int], headers: dict = None):
+    """Returns the given error statuses in order, and then a successful response."""
+    remaining = list(statuses)
+
+    def route(params: dict):
+        if remaining:
+            return json_response(
+                {"ok": False, "error": "fatal_error"},
+                status=remaining.pop(0),
+                headers=headers,
+            )
+        return json_response({"ok": True})
+
+    return route
+
+
+class TestRetrySupport:
+    def test_full_jitter_backoff(self):
+        backoff = FullJitterBackoff(base_delay=1, max_delay=5)
+        for retry_count, upper_bound in [(0, 1), (1, 2), (2, 4), (3, 5), (10, 5)]:
+            for _ in range(20):
+                assert 0 <= backoff.calculate(retry_count) <= upper_bound
+
+    def test_rate_limited_errors(self):
+        engine = RetryEngine(
+            handlers=[
+                RateLimitErrorRetryHandler(max_retry_count=2, backoff=NO_BACKOFF)
+            ]
+        )
+        state = engine.start()
+        for _ in range(2):
+            assert next_retry(engine, state, response=response(429, "7")) == 7
+        # The handler gives up after max_retry_count retries
+        assert next_retry(engine, state, response=response(429, "7")) is None
+        # Other errors are not retried by default
+        assert next_retry(engine, response=response(500)) is None
+
+    def test_separate_handlers(self):
+        engine = RetryEngine(
+            handlers=[
+                ServerErrorRetryHandler(max_retry_count=1, backoff=NO_BACKOFF),
+                ConnectionErrorRetryHandler(max_retry_count=1, backoff=NO_BACKOFF),
+                TimeoutErrorRetryHandler(max_retry_count=1, backoff=NO_BACKOFF),
+            ]
+        )
+        state = engine.start()
+        assert next_retry(engine, state, response=response(503)) == 0
+        assert next_retry(engine, state, response=response(503)) is None
+        assert next_retry(engine, state, error=ConnectionResetError()) == 0
+        # urllib wraps socket errors
+        assert next_retry(engine, state, error=URLError(socket.timeout())) == 0
+        assert next_retry(engine, state, error=socket.timeout()) is None
+        assert next_retry(engine, error=ValueError()) is None
+        assert next_retry(engine, response=response(400)) is None
+
+    def test_max_attempts_and_deadline(self):
+        clock = SimulatedClock()
+        engine = RetryEngine(
+            handlers=[
+                RateLimitErrorRetryHandler(max_retry_count=100, backoff=NO_BACKOFF)
+            ],
+            max_attempts=3,
+            clock=clock,
+        )
+        state = engine.start()
+        assert next_retry(engine, state, response=response(429, "1")) == 1
+        assert next_retry(engine, state, response=response(429, "1")) == 1
+        assert next_retry(engine, state, response=response(429, "1")) is None
+
+        engine = RetryEngine(
+            handlers=[
+                RateLimitErrorRetryHandler(max_retry_count=100, backoff=NO_BACKOFF)
+            ],
+            deadline=60,
+            clock=clock,
+        )
+        state = engine.start()
+        assert next_retry(engine, state, response=response(429, "30")) == 30
+        clock.now += 30
+        # The retry would start after the deadline
+        assert next_retry(engine, state, response=response(429, "31")) is None
+
+    def test_idempotency_guard(self):
+        engine = RetryEngine(
+            handlers=[
+                RateLimitErrorRetryHandler(backoff=NO_BACKOFF),
+                ServerErrorRetryHandler(backoff=NO_BACKOFF),
+                ConnectionErrorRetryHandler(backoff=NO_BACKOFF),
+            ]
+        )
+        # Slack may have already tombstoned the message
+        assert next_retry(engine, None, TOMBSTONE, response=response(503)) is None
+        assert next_retry(engine, None, TOMBSTONE, error=ConnectionResetError()) is None
+        # Rate limited requests were not processed at all
+        assert next_retry(engine, None, TOMBSTONE, response=response(429, "1")) == 1
+
+    def test_on_retry_hooks(self):
+        events: List[RetryEvent] = []
+        engine = RetryEngine(
+            handlers=[ServerErrorRetryHandler(backoff=NO_BACKOFF)],
+            on_retry=[events.append],
+        )
+        state = engine.start()
+        next_retry(engine, state, response=response(502))
+        next_retry(engine, state, response=response(503))
+        assert [e.attempt for e in events] == [2, 3]
+        assert [e.response.status for e in events] == [502, 503]
+        assert isinstance(events[0].handler, ServerErrorRetryHandler)
+        assert "discovery.users.list" in repr(events[0])
+
+
+class TestClientRetries:
+    def setup_method(self):
+        self.server = MockWebApiServer().start()
+
+    def teardown_method(self):
+        self.server.stop()
+
+    def test_server_errors(self):
+        self.server.routes["discovery.users.list"] = failing_route([500, 503])
+        events: List[RetryEvent] = []
+        client = DiscoveryClient(
+            token="xoxp-valid",
+            base_url=self.server.base_url,
+            retry_engine=RetryEngine(
+                handlers=[ServerErrorRetryHandler(backoff=NO_BACKOFF)],
+                on_retry=[events.append],
+            ),
+        )
+        assert client.discovery_users_list()["ok"] is True
+        assert len(self.server.received_requests) == 3
+        assert [e.response.status for e in events] == [500, 503]
+
+    def test_non_idempotent_method(self):
+        self.server.routes["discovery.chat.tombstone"] = failing_route([503])
+        client = DiscoveryClient(
+            token="xoxp-valid",
+            base_url=self.server.base_url,
+            retry_engine=RetryEngine(
+                handlers=[ServerErrorRetryHandler(backoff=NO_BACKOFF)]
+            ),
+        )
+        with pytest.raises(DiscoveryApiError):
+            client.discovery_chat_tombstone(team="T111", channel="C111", ts="111.222")
+        assert len(self.server.received_requests) == 1
+
+    def test_sustained_rate_limited_errors(self):
+        self.server.routes["discovery.users.list"] = failing_route(
+            [429] * 100, headers={"Retry-After": "0"}
+        )
+        client = DiscoveryClient(
+            token="xoxp-valid",
+            base_url=self.server.base_url,
+            retry_engine=RetryEngine(
+                handlers=[RateLimitErrorRetryHandler(backoff=NO_BACKOFF)],
+                max_attempts=5,
+            ),
+        )
+        # Gives up without going deeper into the stack
+        with pytest.raises(DiscoveryApiError) as e:
+            client.discovery_users_list()
+        assert e.value.response.status_code == 429
+        assert len(self.server.received_requests) == 5
+
+    def test_async_client(self):
+        self.server.routes["discovery.users.list"] = failing_route(
+            [429, 502], headers={"Retry-After": "0"}
+        )
+
+        async def run():
+            client = AsyncDiscoveryClient(
+                token="xoxp-valid",
+                base_url=self.server.base_url,
+                retry_engine=RetryEngine(
+                    handlers=[
+                        RateLimitErrorRetryHandler(backoff=NO_BACKOFF),
+                        ServerErrorRetryHandler(backoff=NO_BACKOFF),
+                    ]
+                ),
+            )
+            try:
+                return await client.discovery_users_list()
+            finally:
+                await client.close()
+
+        assert asyncio.run(run())["ok"] is True
+        assert len(self.server.received_requests) == 3